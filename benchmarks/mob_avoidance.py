@@ -0,0 +1,71 @@
+# Frame time of the Mob.avoid_mobs pass, brute force vs. the mob neighbour grid
+# run from the repository root: python -m benchmarks.mob_avoidance
+import random
+import time
+from types import SimpleNamespace
+import pygame as pg
+from tilebased_shooter.settings import *
+from tilebased_shooter.spatial import SpatialHash
+from tilebased_shooter.sprites import Mob
+
+vector = pg.math.Vector2
+
+MAP_WIDTH = 50 * TILESIZE
+MAP_HEIGHT = 30 * TILESIZE
+MOB_COUNTS = [100, 500, 2000]
+FRAMES = 10
+
+
+def avoid_mobs_brute_force(mob, mobs):
+    # the original O(n^2) implementation
+    for other in mobs:
+        if other != mob:
+            dist = mob.pos - other.pos
+            if 0 < dist.length() < MOB_AVOID_RAD:
+                mob.acc += dist.normalize()
+
+
+def make_game(count):
+    game = SimpleNamespace(all_sprites=pg.sprite.Group(), mobs=pg.sprite.Group(),
+                           mob_img=pg.Surface((43, 35)), player=SimpleNamespace(pos=vector(0, 0)),
+                           mob_hash=SpatialHash(MOB_HASH_CELL))
+    for i in range(count):
+        Mob(game, random.uniform(0, MAP_WIDTH), random.uniform(0, MAP_HEIGHT))
+    return game
+
+
+def time_frames(game, avoid):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        avoid(game)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def brute_force_pass(game):
+    mobs = game.mobs.sprites()
+    for mob in mobs:
+        mob.acc = vector(0, 0)
+        avoid_mobs_brute_force(mob, mobs)
+
+
+def grid_pass(game):
+    game.mob_hash.clear()
+    for mob in game.mobs:
+        game.mob_hash.add_point(mob, mob.pos.x, mob.pos.y)
+    for mob in game.mobs:
+        mob.acc = vector(0, 0)
+        mob.avoid_mobs()
+
+
+def main():
+    random.seed(0)
+    print('{:>6} {:>14} {:>14} {:>8}'.format('mobs', 'brute (ms)', 'grid (ms)', 'speedup'))
+    for count in MOB_COUNTS:
+        game = make_game(count)
+        brute = time_frames(game, brute_force_pass)
+        grid = time_frames(game, grid_pass)
+        print('{:>6} {:>14.2f} {:>14.2f} {:>7.1f}x'.format(count, brute, grid, brute / grid))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# Time of the shmup bullet/mob and player/mob checks, pygame's all pairs groupcollide vs. the sorted axis
+# run from the repository root: python -m benchmarks.shmup_collisions
+import random
+import time
+import pygame as pg
+from shmup.settings import *
+from shmup.broadphase import SortedAxis, groupcollide, spritecollide
+
+ENTITY_COUNTS = [50, 200, 500, 1000, 2000]
+FRAMES = 20
+CHECK_WORLDS = 200
+
+
+def make_sprite(x, y, width, height):
+    sprite = pg.sprite.Sprite()
+    sprite.rect = pg.Rect(0, 0, width, height)
+    sprite.rect.center = (x, y)
+    sprite.radius = int(width * .85 / 2)
+    return sprite
+
+
+def make_world(count):
+    # half mobs, half bullets spread over the screen, and the player
+    mobs = [make_sprite(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), random.randrange(10, 100),
+                        random.randrange(10, 90)) for i in range(count // 2)]
+    bullets = [make_sprite(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), 9, 54)
+               for i in range(count - count // 2)]
+    player = make_sprite(WIDTH / 2, HEIGHT - 40, 50, 38)
+    return mobs, bullets, player
+
+
+def all_pairs(mobs, bullets, player):
+    hits = pg.sprite.groupcollide(mobs, bullets, False, False)
+    return hits, pg.sprite.spritecollide(player, mobs, False, pg.sprite.collide_circle)
+
+
+def sorted_axis(mobs, bullets, player):
+    hits = groupcollide(mobs, SortedAxis(bullets), False, False)
+    return hits, spritecollide(player, SortedAxis(mobs), False, pg.sprite.collide_circle)
+
+
+def check_kills():
+    # with kills the order matters, a bullet overlapping two mobs only kills the first
+    # mob in group order. Random crowded worlds, played once by pygame and once by
+    # the sorted axes, must end with the same hits and the same survivors
+    for world in range(CHECK_WORLDS):
+        state = random.getstate()
+        results = []
+        for check in ('pygame', 'axis'):
+            random.setstate(state)
+            mobs, bullets, player = make_world(random.randrange(2, 200))
+            mobs, bullets = pg.sprite.Group(mobs), pg.sprite.Group(bullets)
+            if check == 'pygame':
+                hits = pg.sprite.groupcollide(mobs, bullets, True, True)
+                crashed = pg.sprite.spritecollide(player, mobs, True, pg.sprite.collide_circle)
+            else:
+                hits = groupcollide(mobs, SortedAxis(bullets), True, True)
+                crashed = spritecollide(player, SortedAxis(mobs), True, pg.sprite.collide_circle)
+            # sprites are new objects per run, compare them by their rects
+            key = lambda sprite: tuple(sprite.rect)
+            results.append(([(key(mob), [key(bullet) for bullet in hit]) for mob, hit in hits.items()],
+                            [key(mob) for mob in crashed],
+                            [key(mob) for mob in mobs], [key(bullet) for bullet in bullets]))
+        assert results[0] == results[1], 'sorted axis differs from pygame in world {}'.format(world)
+
+
+def time_frames(check, world):
+    mobs, bullets, player = world
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        result = check(mobs, bullets, player)
+    return (time.perf_counter() - start) / FRAMES * 1000, result
+
+
+def main():
+    random.seed(0)
+    check_kills()
+    print('{} random worlds with kills match pg.sprite.groupcollide / spritecollide'.format(CHECK_WORLDS))
+    print('{:>9} {:>16} {:>16} {:>8}'.format('entities', 'all pairs (ms)', 'sorted axis (ms)', 'speedup'))
+    for count in ENTITY_COUNTS:
+        mobs, bullets, player = make_world(count)
+        world = (pg.sprite.Group(mobs), pg.sprite.Group(bullets), player)
+        brute, expected = time_frames(all_pairs, world)
+        axis, result = time_frames(sorted_axis, world)
+        # without kills both find exactly the same pairs
+        assert {mob: set(hits) for mob, hits in expected[0].items()} == \
+               {mob: set(hits) for mob, hits in result[0].items()}
+        assert set(expected[1]) == set(result[1])
+        print('{:>9} {:>16.3f} {:>16.3f} {:>7.1f}x'.format(count, brute, axis, brute / axis))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Time of updating and of drawing n live shmup explosions, one Explosion sprite each vs. the particle system
+# run from the repository root: python -m benchmarks.shmup_particles
+# the particles win on update once there are dozens of explosions, drawing is blit bound for both
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+import pygame as pg
+from shmup.settings import *
+from shmup.main import Game
+from shmup.sprites import Explosion
+
+EXPLOSION_COUNTS = [1, 10, 50, 200, 1000]
+FRAMES = 30
+
+
+def spawn_sprites(game, count):
+    sprites = pg.sprite.Group()
+    for i in range(count):
+        sprites.add(Explosion(game, (random.uniform(0, WIDTH), random.uniform(0, HEIGHT)), 'lg'))
+    return sprites
+
+
+def spawn_particles(game, count):
+    game.particles.clear()
+    for i in range(count):
+        game.particles.emit('lg', (random.uniform(0, WIDTH), random.uniform(0, HEIGHT)))
+    return game.particles
+
+
+def time_frames(game, effects):
+    # every frame advances the animations and draws them, no explosion finishes in FRAMES steps
+    update = draw = 0
+    for frame in range(FRAMES):
+        game.time += STEP * 1000
+        start = time.perf_counter()
+        effects.update(STEP)
+        middle = time.perf_counter()
+        effects.draw(game.screen)
+        update += middle - start
+        draw += time.perf_counter() - middle
+    return update / FRAMES * 1000, draw / FRAMES * 1000
+
+
+def main():
+    random.seed(0)
+    game = Game(headless=True)
+    if game.particles is None:
+        print('the particle system needs NumPy')
+        return
+    print('{:>11} {:>20} {:>20}'.format('', 'update (ms)', 'draw (ms)'))
+    print('{:>11} {:>10}{:>10} {:>10}{:>10}'.format('explosions', 'sprites', 'particles', 'sprites', 'particles'))
+    for count in EXPLOSION_COUNTS:
+        sprite_update, sprite_draw = time_frames(game, spawn_sprites(game, count))
+        particle_update, particle_draw = time_frames(game, spawn_particles(game, count))
+        print('{:>11} {:>10.3f}{:>10.3f} {:>10.3f}{:>10.3f}'.format(
+            count, sprite_update, particle_update, sprite_draw, particle_draw))
+
+
+if __name__ == '__main__':
+    main()
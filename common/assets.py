@@ -0,0 +1,237 @@
+# Parallel asset loading with an on-disk cache of processed images
+import hashlib
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame as pg
+from common.sources import SourceFiles
+
+# bump when the layout of the cache files changes
+IMAGE_CACHE_VERSION = 1
+
+
+def decoded_bytes(asset):
+    # memory a loaded surface or sound takes, sounds are measured without copying them out with get_raw()
+    if isinstance(asset, pg.Surface):
+        return asset.get_width() * asset.get_height() * asset.get_bytesize()
+    frequency, size, channels = pg.mixer.get_init()
+    return int(asset.get_length() * frequency) * channels * abs(size) // 8
+
+
+def asset_kind(key):
+    # what a report entry is grouped by, the first part of a tuple key like ('flash', name, size)
+    return str(key[0] if isinstance(key, tuple) else key)
+
+
+def normalize(params):
+    # what the params look like after a round trip through json, tuples become lists
+    return json.loads(json.dumps(params))
+
+
+class ImageCache:
+    # already scaled and converted images stored as raw BGRA pixels, one file per
+    # image plus an index.json, and mapped straight back into surfaces with
+    # frombuffer. An entry is stale once one of its source files or the
+    # parameters it was built with change
+    def __init__(self, folder):
+        self.folder = folder
+        self.index = {}
+        self.dirty = False
+        self.sources = SourceFiles()
+        try:
+            with open(os.path.join(folder, 'index.json')) as file:
+                index = json.load(file)
+            if index.get('version') == IMAGE_CACHE_VERSION:
+                self.index = index['images']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, key, sources, params):
+        # the cached surface, or None if there is no valid entry
+        meta = self.index.get(repr(key))
+        if meta is None or meta['params'] != normalize(params):
+            return None
+        if sorted(meta['sources']) != sorted(os.path.abspath(source) for source in sources):
+            return None
+        if not self.sources.is_fresh(meta['sources']):
+            return None
+        if self.sources.touched:
+            # refreshed mtimes, save() writes them back
+            self.dirty = True
+        width, height = meta['size']
+        try:
+            with open(os.path.join(self.folder, meta['file']), 'rb') as file:
+                # private copy on write mapping, the pages are read from disk on first touch
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) != width * height * 4:
+            return None
+        image = pg.image.frombuffer(buffer, (width, height), 'BGRA')
+        # the mapped surface is used as is when it already has the display format
+        if not meta['masks'][3]:
+            image = image.convert()
+        elif list(image.get_masks()) != meta['masks']:
+            image = image.convert_alpha()
+        if meta['colorkey'] is not None:
+            image.set_colorkey(meta['colorkey'])
+        return image
+
+    def info(self, key):
+        # the json data stored along with an entry by put()
+        meta = self.index.get(repr(key))
+        return meta.get('info') if meta else None
+
+    def put(self, key, sources, params, image, info=None):
+        sources = [os.path.abspath(source) for source in sources]
+        name = hashlib.sha1(repr(key).encode()).hexdigest()[:20] + '.raw'
+        os.makedirs(self.folder, exist_ok=True)
+        with open(os.path.join(self.folder, name), 'wb') as file:
+            file.write(pg.image.tobytes(image, 'BGRA'))
+        colorkey = image.get_colorkey()
+        self.index[repr(key)] = {
+            'file': name,
+            'sources': {source: self.sources.fingerprint(source) for source in sources},
+            'params': normalize(params),
+            'size': list(image.get_size()),
+            'masks': list(image.get_masks()),
+            'colorkey': list(colorkey) if colorkey else None,
+            'info': normalize(info)
+        }
+        self.dirty = True
+
+    def save(self):
+        # the index goes last, pixel files it doesn't list are never read
+        if not self.dirty:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        with open(os.path.join(self.folder, 'index.json'), 'w') as file:
+            json.dump({'version': IMAGE_CACHE_VERSION, 'images': self.index}, file, indent=1)
+        self.dirty = False
+
+
+class AssetLoader:
+    # queue images and sounds under a key, then load() decodes the files on a
+    # thread pool and does the display bound convert()/convert_alpha(), the
+    # scaling and the volume setup on the calling thread, which must be the main
+    # thread. With an ImageCache, images found in the cache are not decoded at all
+    def __init__(self, workers=4, cache=None):
+        self.workers = workers
+        self.cache = cache
+        self.queue = []
+        self.report = []
+
+    def image(self, key, path, alpha=True, size=None, area=None, colorkey=None):
+        # area cuts a sub image out of the file, size scales the (cut) image
+        options = {'alpha': alpha, 'size': size, 'area': area, 'colorkey': colorkey}
+        self.queue.append(('image', key, path, options))
+
+    def sound(self, key, path, volume=None):
+        self.queue.append(('sound', key, path, volume))
+
+    def decode(self, job):
+        kind, path = job
+        start = time.perf_counter()
+        if kind == 'image':
+            asset = pg.image.load(path)
+        else:
+            asset = pg.mixer.Sound(path)
+        return asset, time.perf_counter() - start
+
+    def process(self, image, options):
+        image = image.convert_alpha() if options['alpha'] else image.convert()
+        if options['area']:
+            image = image.subsurface(options['area'])
+        if options['size']:
+            image = pg.transform.scale(image, options['size'])
+        elif options['area']:
+            image = image.copy()
+        if options['colorkey'] is not None:
+            image.set_colorkey(options['colorkey'])
+        return image
+
+    def load(self):
+        self.report = []
+        start = time.perf_counter()
+        assets = {}
+        pending = []
+        for entry in self.queue:
+            kind, key, path, option = entry
+            if kind == 'image' and self.cache is not None:
+                cache_start = time.perf_counter()
+                image = self.cache.get(key, [path], option)
+                if image is not None:
+                    assets[key] = image
+                    self.report.append({
+                        'key': str(key),
+                        'kind': asset_kind(key),
+                        'path': path,
+                        'bytes': decoded_bytes(image),
+                        'cached': True,
+                        'decode_ms': 0,
+                        'convert_ms': (time.perf_counter() - cache_start) * 1000
+                    })
+                    continue
+            pending.append(entry)
+
+        # every image file is decoded once, even if several entries are cut or scaled from it,
+        # its decode time is split evenly between those entries in the report
+        jobs = {}
+        users = {}
+        for kind, key, path, option in pending:
+            job = (kind, path) if kind == 'image' else (kind, key)
+            jobs.setdefault(job, (kind, path))
+            users[job] = users.get(job, 0) + 1
+        decode_start = time.perf_counter()
+        with ThreadPoolExecutor(self.workers) as pool:
+            decoded = dict(zip(jobs, pool.map(self.decode, jobs.values())))
+        decode_time = time.perf_counter() - decode_start
+
+        for kind, key, path, option in pending:
+            convert_start = time.perf_counter()
+            job = (kind, path) if kind == 'image' else (kind, key)
+            asset, seconds = decoded[job]
+            if kind == 'image':
+                asset = self.process(asset, option)
+                if self.cache is not None:
+                    self.cache.put(key, [path], option, asset)
+            elif option is not None:
+                asset.set_volume(option)
+            assets[key] = asset
+            self.report.append({
+                'key': str(key),
+                'kind': asset_kind(key),
+                'path': path,
+                'bytes': decoded_bytes(asset),
+                'cached': False,
+                'decode_ms': seconds * 1000 / users[job],
+                'convert_ms': (time.perf_counter() - convert_start) * 1000
+            })
+        if self.cache is not None:
+            self.cache.save()
+        # the entries add up to the total, decoding runs on several threads so the
+        # decode time can be more than the wall clock time it took
+        self.report.append({
+            'key': 'total',
+            'kind': 'total',
+            'path': None,
+            'bytes': sum(entry['bytes'] for entry in self.report),
+            'cached': not pending,
+            'decode_ms': sum(entry['decode_ms'] for entry in self.report),
+            'convert_ms': sum(entry['convert_ms'] for entry in self.report),
+            'wall_ms': (time.perf_counter() - start) * 1000,
+            'decode_wall_ms': decode_time * 1000
+        })
+        self.queue = []
+        return assets
+
+    def print_report(self):
+        # bytes of the loaded surfaces and sounds, not of the files
+        for entry in self.report:
+            entry = dict(entry, source='cache' if entry['cached'] else 'file')
+            print('{key:<40} {bytes:>9} B  {source:<5}  decode {decode_ms:7.2f} ms  convert {convert_ms:6.2f} ms'.format(**entry))
+        total = self.report[-1] if self.report else None
+        if total:
+            print('{:<40} {:>9}    wall   decode {decode_wall_ms:7.2f} ms  total   {wall_ms:6.2f} ms'.format('', '', **total))
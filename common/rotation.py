@@ -0,0 +1,89 @@
+# Shared cache of rotated surfaces
+from collections import OrderedDict
+import pygame as pg
+
+
+class RotationCache:
+    # memoizes pg.transform.rotate results with angles snapped to a fixed step,
+    # keeping at most max_size images and evicting the least recently used one
+    def __init__(self, step=5, max_size=1024):
+        self.step = step
+        self.max_size = max_size
+        self.images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def quantize(self, angle):
+        return round(angle / self.step) * self.step % 360
+
+    def get(self, image, angle):
+        key = (image, self.quantize(angle))
+        rotated = self.images.get(key)
+        if rotated is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return rotated
+        self.misses += 1
+        rotated = pg.transform.rotate(image, key[1])
+        self.images[key] = rotated
+        if len(self.images) > self.max_size:
+            self.images.popitem(last=False)
+        return rotated
+
+    def prerender(self, image):
+        # render every angle of image up front instead of on first use
+        angle = 0
+        while angle < 360:
+            self.get(image, angle)
+            angle += self.step
+
+    def clear(self):
+        self.images.clear()
+
+
+class RotationStrip:
+    # every rotation of one image, step degrees apart, rendered once into a
+    # single strip surface (a grid of equally sized cells) and handed out as
+    # subsurfaces. With an ImageCache the strip and its frame rects are stored
+    # on disk under key (call cache.save() afterwards), so later runs skip the rotating
+    def __init__(self, image, step=5, columns=12, cache=None, key=None, sources=()):
+        self.image = image
+        self.step = step
+        count = -(-360 // step)
+        params = {'step': step, 'columns': columns, 'size': image.get_size()}
+        strip = rects = None
+        if cache is not None and key is not None:
+            strip = cache.get(key, sources, params)
+            rects = cache.info(key)
+        if strip is None or rects is None:
+            strip, rects = self.render(image, step, count, columns)
+            if cache is not None and key is not None:
+                cache.put(key, sources, params, strip, rects)
+        self.strip = strip
+        self.frames = [strip.subsurface(rect) for rect in rects]
+        self.sizes = [frame.get_size() for frame in self.frames]
+
+    def render(self, image, step, count, columns):
+        frames = [pg.transform.rotate(image, index * step) for index in range(count)]
+        width = max(frame.get_width() for frame in frames)
+        height = max(frame.get_height() for frame in frames)
+        rows = -(-count // columns)
+        strip = pg.Surface((width * columns, height * rows), image.get_flags() & pg.SRCALPHA, image)
+        colorkey = image.get_colorkey()
+        if colorkey:
+            strip.fill(colorkey)
+            strip.set_colorkey(colorkey)
+        rects = []
+        for index, frame in enumerate(frames):
+            x = index % columns * width
+            y = index // columns * height
+            # copy the pixels as they are, colorkey and alpha included
+            strip.blit(frame, (x, y), special_flags=pg.BLEND_RGBA_MAX if not colorkey else 0)
+            rects.append((x, y, frame.get_width(), frame.get_height()))
+        return strip, rects
+
+    def index(self, angle):
+        return round(angle / self.step) % len(self.frames)
+
+    def get(self, angle):
+        return self.frames[self.index(angle)]
@@ -0,0 +1,94 @@
+# Lazy, memory bounded sound effects
+from collections import OrderedDict
+import pygame as pg
+from common.assets import AssetLoader, decoded_bytes
+
+
+class SoundBank:
+    # sounds are registered by key and only decoded the first time they are
+    # played. Decoded sounds live in an LRU bounded by the bytes of their sample
+    # buffers, preload() decodes a hot set up front and pins it against eviction
+    def __init__(self, max_bytes, workers=4):
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.sources = {}
+        self.loaded = OrderedDict()
+        self.sizes = {}
+        self.pinned = set()
+        self.bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, key, path, volume=None):
+        self.sources[key] = (path, volume)
+
+    def store(self, key, sound):
+        self.loaded[key] = sound
+        self.sizes[key] = decoded_bytes(sound)
+        self.bytes += self.sizes[key]
+        self.loads += 1
+
+    def get(self, key):
+        sound = self.loaded.get(key)
+        if sound is None:
+            path, volume = self.sources[key]
+            sound = pg.mixer.Sound(path)
+            if volume is not None:
+                sound.set_volume(volume)
+            self.store(key, sound)
+            self.evict(key)
+        else:
+            self.loaded.move_to_end(key)
+        return sound
+
+    def play(self, key, loops=0, maxtime=0, fade_ms=0):
+        return self.get(key).play(loops, maxtime, fade_ms)
+
+    def preload(self, keys, pin=True):
+        # decode everything missing on a thread pool
+        loader = AssetLoader(self.workers)
+        for key in keys:
+            if key not in self.loaded:
+                path, volume = self.sources[key]
+                loader.sound(key, path, volume)
+        for key, sound in loader.load().items():
+            self.store(key, sound)
+        if pin:
+            self.pinned.update(keys)
+        self.evict()
+
+    def unpin(self, keys):
+        self.pinned.difference_update(keys)
+        self.evict()
+
+    def evict(self, keep=None):
+        # drop least recently played sounds until the bank fits, pinned and
+        # currently playing sounds stay (freeing a sound stops its channels),
+        # and so does keep, the sound that is about to be played
+        if self.bytes <= self.max_bytes:
+            return
+        for key in list(self.loaded):
+            if self.bytes <= self.max_bytes:
+                break
+            if key == keep or key in self.pinned or self.loaded[key].get_num_channels():
+                continue
+            del self.loaded[key]
+            self.bytes -= self.sizes.pop(key)
+            self.evictions += 1
+
+    def clear(self):
+        self.loaded.clear()
+        self.sizes.clear()
+        self.pinned.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            'registered': len(self.sources),
+            'loaded': len(self.loaded),
+            'pinned': len(self.pinned),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'loads': self.loads,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,39 @@
+# Change detection for the files a cache was built from
+import hashlib
+import os
+
+
+class SourceFiles:
+    # a cache stores its sources as {path: [mtime, sha1]}, is_fresh() compares
+    # the cheap mtimes first and only hashes a file whose mtime moved. Checks and
+    # hashes are memoized, use one instance per run
+    def __init__(self):
+        self.mtimes = {}
+        self.hashes = {}
+        # set once a stored mtime was refreshed, the caller should write its sources back
+        self.touched = False
+
+    def file_hash(self, source):
+        if source not in self.hashes:
+            with open(source, 'rb') as file:
+                self.hashes[source] = hashlib.sha1(file.read()).hexdigest()
+        return self.hashes[source]
+
+    def fingerprint(self, source):
+        return [os.path.getmtime(source), self.file_hash(source)]
+
+    def is_fresh(self, sources):
+        # a source whose mtime moved but whose content did not is still fresh, its
+        # stored mtime is updated in place so the next run skips the hashing
+        for source, (mtime, digest) in sources.items():
+            if source not in self.mtimes:
+                self.mtimes[source] = os.path.getmtime(source) if os.path.exists(source) else None
+            current = self.mtimes[source]
+            if current is None:
+                return False
+            if current != mtime:
+                if self.file_hash(source) != digest:
+                    return False
+                sources[source][0] = current
+                self.touched = True
+        return True
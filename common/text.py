@@ -0,0 +1,44 @@
+# Shared font and rendered text caches
+from collections import OrderedDict
+import pygame as pg
+
+
+class FontRegistry:
+    # loads every font file once per (name, size)
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pg.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+
+class TextCache:
+    # keeps the last max_size rendered text surfaces, keyed by everything that affects the pixels
+    def __init__(self, max_size=256, fonts=None):
+        self.max_size = max_size
+        self.fonts = fonts or FontRegistry()
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font_name, size, color, antialias=True):
+        key = (text, font_name, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.fonts.get(font_name, size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
@@ -0,0 +1,80 @@
+# Seeded procedural platforms
+import random
+from collections import deque
+from platformer.settings import *
+from platformer.sprites import Platform
+
+# highest and widest a single jump gets, from the per frame physics in Player.update
+JUMP_HEIGHT = PLAYER_JUMP ** 2 / (2 * PLAYER_GRAVITY)
+JUMP_DISTANCE = PLAYER_ACCELERATION / -PLAYER_FRICTION * 2 * PLAYER_JUMP / PLAYER_GRAVITY
+
+
+class PlatformGenerator:
+    # lays out platforms a chunk (a band of PLATFORM_CHUNK_HEIGHT world pixels)
+    # at a time as plain (x, y, image, powerup) tuples, every platform within
+    # jumping reach of the one below it. Chunks are generated PLATFORM_LOOKAHEAD
+    # bands ahead of the camera and turned into sprites shortly before they
+    # scroll into view, platforms that scroll off are recycled
+    def __init__(self, game, seed=None):
+        self.game = game
+        self.random = random.Random(seed)
+        self.images = [game.sprite_sheet.get_named(name) for name in PLATFORM_IMAGES]
+        self.buffer = deque()
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        self.last = None
+
+    def start(self, platforms):
+        # place the fixed starting platforms, generation continues above the highest one
+        for x, y in platforms:
+            image = self.random.randrange(len(self.images))
+            self.spawn(x, y, image, False)
+            self.last = (x + self.images[image].get_width() / 2, y)
+
+    def generate_chunk(self):
+        # no sprites or surfaces are touched here, only numbers
+        chunk = []
+        x, y = self.last
+        top = y - PLATFORM_CHUNK_HEIGHT
+        max_gap = JUMP_HEIGHT * PLATFORM_REACH
+        max_dx = JUMP_DISTANCE * PLATFORM_REACH
+        while y > top:
+            y -= self.random.uniform(PLATFORM_MIN_GAP, max_gap)
+            image = self.random.randrange(len(self.images))
+            width = self.images[image].get_width()
+            x = self.random.uniform(max(width / 2, x - max_dx), min(WIDTH - width / 2, x + max_dx))
+            chunk.append((round(x - width / 2), round(y), image, self.random.randrange(100) < POW_SPAWN_PCT))
+        self.last = (x, y)
+        return chunk
+
+    def spawn(self, x, y, image, powerup):
+        if self.free:
+            platform = self.free.pop()
+            platform.reset(x, y, self.images[image], powerup)
+            self.reused += 1
+        else:
+            platform = Platform(self.game, x, y, self.images[image], powerup)
+            self.created += 1
+        return platform
+
+    def recycle(self, platform):
+        platform.kill()
+        self.free.append(platform)
+
+    def update(self):
+        view_top = self.game.camera.world_y(0)
+        # keep the lookahead buffer filled
+        while self.last[1] > view_top - PLATFORM_LOOKAHEAD * PLATFORM_CHUNK_HEIGHT:
+            self.buffer.extend(self.generate_chunk())
+        # the buffer is ordered bottom to top, spawn what is about to come into view
+        while self.buffer and self.buffer[0][1] >= view_top - PLATFORM_SPAWN_MARGIN:
+            self.spawn(*self.buffer.popleft())
+
+    def stats(self):
+        return {
+            'buffered': len(self.buffer),
+            'free': len(self.free),
+            'created': self.created,
+            'reused': self.reused
+        }
@@ -4,6 +4,10 @@ import random
 import pygame as pg
 from platformer.settings import *
 from platformer.sprites import *
+from platformer.generator import PlatformGenerator
+from common.text import TextCache
+from common.assets import AssetLoader, ImageCache
+from common.sounds import SoundBank
 
 
 class Game:
@@ -22,6 +26,7 @@ class Game:
 
         # initialize game variables
         self.font_name = pg.font.match_font(FONT_NAME)
+        self.text_cache = TextCache(TEXT_CACHE_SIZE)
         self.running = True
         self.playing = False
         self.player = None
@@ -40,14 +45,15 @@ class Game:
         self.clouds = pg.sprite.Group()
 
         self.mob_timer = 0
+        self.camera = Camera()
 
         # initialize score at 0
         self.score = 0
 
         # spawn sprites
         self.player = Player(self)
-        for p in PLATFORM_LIST:
-            Platform(self, *p)
+        self.generator = PlatformGenerator(self, PLATFORM_SEED)
+        self.generator.start(PLATFORM_LIST)
 
         # load game music
         pg.mixer.music.load(path.join(self.snd_dir, 'background_music.ogg'))
@@ -86,7 +92,7 @@ class Game:
             Mob(self)
 
         # check if player hits a mob
-        hits = pg.sprite.spritecollide(self.player, self.mobs, False, pg.sprite.collide_mask)
+        hits = pg.sprite.spritecollide(self.player, self.mobs, False, collide_rect_mask)
         if hits:
             self.playing = False
 
@@ -104,42 +110,36 @@ class Game:
                         self.player.velocity.y = 0
                         self.player.jumping = False
 
-        # if player reaches top 4th of screen
-        if self.player.rect.top <= HEIGHT / 4:
+        # if player reaches top 4th of screen scroll the camera up
+        if self.camera.apply(self.player).top <= HEIGHT / 4:
             if random.randrange(100) < 5:
                 Cloud(self)
 
-            self.player.position.y += max(abs(self.player.velocity.y), 5)
-            for cloud in self.clouds:
-                cloud.rect.y += max(abs(self.player.velocity.y / 2), 2)
-            for mob in self.mobs:
-                mob.rect.y += max(abs(self.player.velocity.y), 5)
+            self.camera.scroll(max(abs(self.player.velocity.y), 5))
             for platform in self.platforms:
-                platform.rect.y += max(abs(self.player.velocity.y), 5)
-                if platform.rect.top >= HEIGHT:
-                    platform.kill()
+                if self.camera.apply(platform).top >= HEIGHT:
+                    self.generator.recycle(platform)
                     # increase player score when platform pushed off screen
                     self.score += 10
 
-        # spawn new platforms to keep constant amount
-        while len(self.platforms) < 6:
-            width = random.randrange(50, 100)
-            Platform(self, random.randrange(0, WIDTH-width), random.randrange(-75, -30))
+        # place the platforms that are about to scroll into view
+        if self.playing:
+            self.generator.update()
 
         # if player hits powerup
         hits = pg.sprite.spritecollide(self.player, self.powerups, True)
         for powerup in hits:
             if powerup.type == 'boost':
-                self.boost_sound.play()
+                self.sounds.play('boost')
                 self.player.velocity.y = -BOOST_POWER
                 self.player.jumping = False
 
-        # player death
-        if self.player.rect.bottom > HEIGHT:
-            for sprite in self.all_sprites:
-                sprite.rect.y -= max(self.player.velocity.y, 10)
-                if sprite.rect.bottom < 0:
-                    sprite.kill()
+        # player death, the camera follows the fall until every platform left the screen
+        if self.camera.apply(self.player).bottom > HEIGHT:
+            self.camera.scroll(-max(self.player.velocity.y, 10))
+            for platform in self.platforms:
+                if self.camera.apply(platform).bottom < 0:
+                    platform.kill()
 
         if len(self.platforms) == 0:
             self.playing = False
@@ -163,7 +163,8 @@ class Game:
     def draw(self):
         # game loop - draw section
         self.screen.fill(BG_COLOR)
-        self.all_sprites.draw(self.screen)
+        for sprite in self.all_sprites:
+            self.screen.blit(sprite.image, self.camera.apply(sprite))
         self.draw_text(str(self.score), 22, WHITE, WIDTH / 2, 15)
         # *after* drawing everything, flip the display
         pg.display.flip()
@@ -176,16 +177,27 @@ class Game:
             except:
                 self.high_score = 0
 
+        # decode images in parallel, images come from the cache on warm starts
+        cache = ImageCache(path.join(self.game_dir, ASSET_CACHE_DIR)) if ASSET_CACHE else None
+        loader = AssetLoader(ASSET_WORKERS, cache)
+        for i in range(1, 4):
+            loader.image(('cloud', i), path.join(self.img_dir, 'cloud{}.png'.format(i)), alpha=False)
+        assets = loader.load()
+        self.load_report = loader.report
+
         # load images
-        self.sprite_sheet = Spritesheet(path.join(self.img_dir, SPRITE_SHEET))
+        self.sprite_sheet = Spritesheet(path.join(self.img_dir, SPRITE_SHEET), cache,
+                                        path.join(self.img_dir, SPRITE_ATLAS))
+        self.sprite_sheet.prewarm(PREWARM_SPRITES)
         self.cloud_images = []
         for i in range(1, 4):
-            self.cloud_images.append(pg.image.load(path.join(self.img_dir, 'cloud{}.png'.format(i))).convert())
-
+            self.cloud_images.append(assets[('cloud', i)])
 
-        # load sounds
-        self.jump_sound = pg.mixer.Sound(path.join(self.snd_dir, 'jump1.wav'))
-        self.boost_sound = pg.mixer.Sound(path.join(self.snd_dir, 'boost.wav'))
+        # register sounds, they are decoded on first play
+        self.sounds = SoundBank(SOUND_BANK_BYTES, ASSET_WORKERS)
+        self.sounds.register('jump', path.join(self.snd_dir, 'jump1.wav'))
+        self.sounds.register('boost', path.join(self.snd_dir, 'boost.wav'))
+        self.sounds.preload(['jump'])
 
     def show_start_screen(self):
         pass
@@ -226,8 +238,7 @@ class Game:
                     waiting = False
 
     def draw_text(self, text, size, color, x, y):
-        font = pg.font.Font(self.font_name, size)
-        text_surface = font.render(text, True, color)
+        text_surface = self.text_cache.render(text, self.font_name, size, color)
         text_rect = text_surface.get_rect()
         text_rect.midtop = (x, y)
         self.screen.blit(text_surface, text_rect)
@@ -17,6 +17,9 @@ PLATFORM_LAYER = 1
 POWERUP_LAYER = 1
 CLOUD_LAYER = 0
 
+# Scrolling, clouds move at this fraction of the world's scroll speed
+CLOUD_PARALLAX = 0.5
+
 # Starting platforms
 PLATFORM_LIST = [(0, HEIGHT - 60),
                  (WIDTH / 2 - 50, HEIGHT * 3 / 4),
@@ -24,6 +27,16 @@ PLATFORM_LIST = [(0, HEIGHT - 60),
                  (350, 200),
                  (175, 100)]
 
+# Platform generation, PLATFORM_SEED None picks a new layout every game
+PLATFORM_SEED = None
+PLATFORM_IMAGES = ['ground_grass.png', 'ground_grass_small.png']
+PLATFORM_CHUNK_HEIGHT = HEIGHT / 2
+PLATFORM_LOOKAHEAD = 2
+PLATFORM_SPAWN_MARGIN = 100
+PLATFORM_MIN_GAP = 70
+# fraction of the highest and widest possible jump a gap may use
+PLATFORM_REACH = 0.7
+
 # Game properties
 BOOST_POWER = 60
 POW_SPAWN_PCT = 7
@@ -41,7 +54,17 @@ BG_COLOR = LIGHT_BLUE
 
 # Fonts
 FONT_NAME = 'arial'
+TEXT_CACHE_SIZE = 64
+ASSET_WORKERS = 4
+ASSET_CACHE = True
+ASSET_CACHE_DIR = '.assetcache'
+SOUND_BANK_BYTES = 1024 * 1024
 
 # External files
 HIGH_SCORE_FILE = 'highscore.txt'
 SPRITE_SHEET = 'spritesheet_jumper.png'
+SPRITE_ATLAS = 'spritesheet_jumper.xml'
+# sub textures the game uses, cut once while loading
+PREWARM_SPRITES = ['bunny1_ready.png', 'bunny1_stand.png', 'bunny1_walk1.png', 'bunny1_walk2.png', 'bunny1_jump.png',
+                   'ground_grass.png', 'ground_grass_small.png', 'powerup_jetpack.png',
+                   'flyMan_fly.png', 'flyMan_jump.png']
@@ -1,23 +1,105 @@
 # Sprite classes
+import xml.etree.ElementTree as ElementTree
 import pygame as pg
 from platformer.settings import *
 import random
 vector = pg.math.Vector2
 
 
-class Spritesheet:
-    # utility class for loading and parsing sprite sheets
-    def __init__(self, filename):
-        self.sprite_sheet = pg.image.load(filename).convert()
+class Camera:
+    # sprites live in world coordinates, the camera keeps the vertical scroll as
+    # a float offset from world to screen, so scrolling is a single addition and
+    # slow (parallax) scrolling accumulates instead of being truncated by rects
+    def __init__(self):
+        self.y = 0
 
-    def get_image(self, x, y, width, height):
-        # grab a sub texture out of the sprite sheet
+    def scroll(self, dy):
+        self.y += dy
+
+    def offset(self, parallax=1):
+        return round(self.y * parallax)
+
+    def apply(self, sprite):
+        # sprites with a parallax factor below 1 scroll slower than the world
+        return sprite.rect.move(0, self.offset(getattr(sprite, 'parallax', 1)))
+
+    def world_y(self, y, parallax=1):
+        # world position of a screen y coordinate
+        return y - self.offset(parallax)
+
+
+def collide_rect_mask(one, two):
+    # cheap rect overlap first, the pixel masks are only compared for overlapping rects
+    return one.rect.colliderect(two.rect) and pg.sprite.collide_mask(one, two)
+
+
+class Spritesheet:
+    # utility class for loading and parsing sprite sheets, every sub texture is
+    # cut once and the same surface is handed out afterwards, so callers must
+    # not draw on what get_image returns
+    def __init__(self, filename, cache=None, atlas=None):
+        self.filename = filename
+        self.cache = cache
+        # the sheet itself is only decoded once a sub texture is missing from the caches
+        self.sprite_sheet = None
+        self.images = {}
+        self.masks = {}
+        self.hits = 0
+        self.misses = 0
+        # named regions from a TextureAtlas xml file
+        self.regions = {}
+        if atlas:
+            for texture in ElementTree.parse(atlas).getroot().iter('SubTexture'):
+                self.regions[texture.get('name')] = tuple(int(texture.get(attribute))
+                                                          for attribute in ('x', 'y', 'width', 'height'))
+
+    def cut(self, x, y, width, height):
+        params = {'area': (x, y, width, height), 'size': (int(width / 2), int(height / 2)), 'colorkey': BLACK}
+        if self.cache is not None:
+            image = self.cache.get(('sheet', x, y, width, height), [self.filename], params)
+            if image is not None:
+                return image
+        if self.sprite_sheet is None:
+            self.sprite_sheet = pg.image.load(self.filename).convert()
         image = pg.Surface((width, height))
         image.blit(self.sprite_sheet, (0, 0), (x, y, width, height))
         image = pg.transform.scale(image, (int(width / 2), int(height / 2)))
         image.set_colorkey(BLACK)
+        if self.cache is not None:
+            self.cache.put(('sheet', x, y, width, height), [self.filename], params, image)
         return image
 
+    def get_image(self, x, y, width, height):
+        # grab a sub texture out of the sprite sheet
+        image = self.images.get((x, y, width, height))
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        image = self.images[(x, y, width, height)] = self.cut(x, y, width, height)
+        if self.cache is not None:
+            self.cache.save()
+        return image
+
+    def get_mask(self, image):
+        # collision mask of a fixed animation frame, built on first use
+        mask = self.masks.get(image)
+        if mask is None:
+            mask = self.masks[image] = pg.mask.from_surface(image)
+        return mask
+
+    def get_named(self, name):
+        return self.get_image(*self.regions[name])
+
+    def prewarm(self, names):
+        # cut the named sub textures (all atlas regions if names is None) up front
+        for name in self.regions if names is None else names:
+            region = self.regions[name]
+            if region not in self.images:
+                self.images[region] = self.cut(*region)
+        if self.cache is not None:
+            self.cache.save()
+
 
 class Player(pg.sprite.Sprite):
     def __init__(self, game):
@@ -79,7 +161,7 @@ class Player(pg.sprite.Sprite):
         hits = pg.sprite.spritecollide(self, self.game.platforms, False)
         self.rect.x -= 2
         if hits and not self.jumping:
-            self.game.jump_sound.play()
+            self.game.sounds.play('jump')
             self.jumping = True
             self.velocity.y = -PLAYER_JUMP
 
@@ -125,7 +207,7 @@ class Player(pg.sprite.Sprite):
             self.rect = self.image.get_rect()
             self.rect.bottom = bottom
 
-        self.mask = pg.mask.from_surface(self.image)
+        self.mask = self.game.sprite_sheet.get_mask(self.image)
 
     def load_images(self):
         self.standing_frames.append(self.game.sprite_sheet.get_image(614, 1063, 120, 191))
@@ -141,21 +223,27 @@ class Player(pg.sprite.Sprite):
 
 
 class Platform(pg.sprite.Sprite):
-    def __init__(self, game, x, y):
+    # recycled by the PlatformGenerator, reset() places a platform again
+    def __init__(self, game, x, y, image, powerup):
         self._layer = PLATFORM_LAYER
         self.groups = game.all_sprites, game.platforms
-        pg.sprite.Sprite.__init__(self, self.groups)
+        pg.sprite.Sprite.__init__(self)
         self.game = game
-        images = [
-            self.game.sprite_sheet.get_image(0, 288, 380, 94),
-            self.game.sprite_sheet.get_image(213, 1662, 201, 100)
-        ]
-        self.image = random.choice(images)
+        self.powerup = None
+        self.reset(x, y, image, powerup)
+
+    def reset(self, x, y, image, powerup):
+        self.image = image
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
-        if random.randrange(100) < POW_SPAWN_PCT:
-            Powerup(self.game, self )
+        self.add(self.groups)
+        # a powerup left over from the platform's previous life must not follow it
+        if self.powerup is not None:
+            self.powerup.kill()
+            self.powerup = None
+        if powerup:
+            self.powerup = Powerup(self.game, self)
 
 
 class Powerup(pg.sprite.Sprite):
@@ -191,7 +279,7 @@ class Mob(pg.sprite.Sprite):
         self.velocity_x = random.randrange(1, 4)
         if self.rect.centerx > WIDTH:
             self.velocity_x *= -1
-        self.rect.y = random.randrange(HEIGHT / 2)
+        self.rect.y = self.game.camera.world_y(random.randrange(HEIGHT / 2))
         self.velocity_y = 0
         self.duration_y = 0.5
 
@@ -207,7 +295,7 @@ class Mob(pg.sprite.Sprite):
         else:
             self.image = self.image_down
         self.rect = self.image.get_rect()
-        self.mask = pg.mask.from_surface(self.image)
+        self.mask = self.game.sprite_sheet.get_mask(self.image)
         self.rect.center = center
 
         self.rect.y += self.velocity_y
@@ -216,6 +304,8 @@ class Mob(pg.sprite.Sprite):
 
 
 class Cloud(pg.sprite.Sprite):
+    parallax = CLOUD_PARALLAX
+
     def __init__(self, game):
         self._layer = CLOUD_LAYER
         self.groups = game.all_sprites, game.clouds
@@ -227,8 +317,8 @@ class Cloud(pg.sprite.Sprite):
         scale = random.randrange(50, 101) / 100
         self.image = pg.transform.scale(self.image, (int(self.rect.width * scale), int(self.rect.height * scale)))
         self.rect.x = random.randrange(WIDTH - self.rect.width)
-        self.rect.y = random.randrange(-500, -50)
+        self.rect.y = self.game.camera.world_y(random.randrange(-500, -50), self.parallax)
 
     def update(self):
-        if self.rect.top > HEIGHT * 2:
+        if self.game.camera.apply(self).top > HEIGHT * 2:
             self.kill()
\ No newline at end of file
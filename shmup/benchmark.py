@@ -0,0 +1,71 @@
+# Headless soak and balance run of the simulation, as fast as it goes
+# run from the repository root: python -m shmup.benchmark --ticks 100000
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def autopilot(game):
+    # keep firing and steer under the lowest mob
+    player = game.player
+    target = max(game.mobs, key=lambda mob: mob.rect.bottom, default=None)
+    controls = {'fire'}
+    if target is not None:
+        if target.rect.centerx < player.rect.centerx - 5:
+            controls.add('left')
+        elif target.rect.centerx > player.rect.centerx + 5:
+            controls.add('right')
+    return controls
+
+
+def run(ticks=100000, seed=0, idle=False):
+    # keep stdout clean for the JSON report
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    from shmup.main import Game
+    from shmup.settings import STEP
+
+    game = Game(headless=True)
+    game.new(seed)
+    games = []
+    start = time.perf_counter()
+    for tick in range(ticks):
+        game.controls = set() if idle else autopilot(game)
+        game.update(STEP)
+        if game.game_over:
+            games.append({'score': game.score, 'seconds': game.time / 1000})
+            game.new(seed + len(games))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'ticks': ticks,
+        'seed': seed,
+        'step': STEP,
+        'ticks_per_sec': ticks / elapsed,
+        'realtime_factor': ticks * STEP / elapsed,
+        'games': games,
+        'mean_score': sum(played['score'] for played in games) / len(games) if games else None,
+        'mean_seconds': sum(played['seconds'] for played in games) / len(games) if games else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the shmup simulation headless and report JSON.')
+    parser.add_argument('--ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--idle', action='store_true', help='no input instead of the autopilot')
+    parser.add_argument('--output', help='write the report to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = run(args.ticks, args.seed, args.idle)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
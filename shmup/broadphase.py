@@ -0,0 +1,77 @@
+# Sorted axis broadphase for the collision checks
+from bisect import bisect_left
+from math import ceil
+import pygame as pg
+
+
+def circle_overhang(sprite):
+    # how far the circle pg.sprite.collide_circle uses reaches past the sprite's rect
+    rect = sprite.rect
+    radius = getattr(sprite, 'radius', None)
+    if radius is None:
+        radius = 0.5 * (rect.width ** 2 + rect.height ** 2) ** 0.5
+    return max(0, ceil(radius - min(rect.width, rect.height) / 2))
+
+
+class SortedAxis:
+    # the sprites sorted by rect.left, a query only looks at sprites whose left
+    # edge is within the widest sprite's width of the query rect, so checking m
+    # mobs against n bullets costs O((n + m) log n) instead of O(n * m).
+    # Rebuild it every step, the sprites move
+    def __init__(self, sprites):
+        sprites = list(sprites)
+        # position in the original (group) order, hits are reported in that order like pygame does
+        self.order = {sprite: i for i, sprite in enumerate(sprites)}
+        self.sprites = sorted(sprites, key=lambda sprite: sprite.rect.left)
+        self.rects = [sprite.rect for sprite in self.sprites]
+        self.lefts = [rect.left for rect in self.rects]
+        self.max_width = max((rect.width for rect in self.rects), default=0)
+        self.overhang = None
+
+    def circle_overhang(self):
+        # circles can stick out of their rects, circle queries widen the rect by this much
+        if self.overhang is None:
+            self.overhang = max((circle_overhang(sprite) for sprite in self.sprites), default=0)
+        return self.overhang
+
+    def query(self, rect):
+        # sprites whose rect overlaps rect, the exact test on the slice runs in C
+        start = bisect_left(self.lefts, rect.left - self.max_width + 1)
+        end = bisect_left(self.lefts, rect.right, start)
+        sprites = self.sprites
+        return [sprites[start + i] for i in rect.collidelistall(self.rects[start:end])]
+
+
+def spritecollide(sprite, axis, dokill, collided=None):
+    # pg.sprite.spritecollide against the sprites of a SortedAxis, killed ones are
+    # skipped and collided only runs for overlapping rects. For collide_circle the
+    # rect is widened by both circles' overhang, so it finds the same hits as pygame
+    rect = sprite.rect
+    if collided is pg.sprite.collide_circle:
+        margin = circle_overhang(sprite) + axis.circle_overhang()
+        rect = rect.inflate(2 * margin, 2 * margin)
+    hits = [other for other in axis.query(rect)
+            if other.alive() and (collided is None or collided(sprite, other))]
+    if len(hits) > 1:
+        hits.sort(key=axis.order.__getitem__)
+    if dokill:
+        for other in hits:
+            other.kill()
+    return hits
+
+
+def groupcollide(group, axis, dokill_group, dokill_axis, collided=None):
+    # pg.sprite.groupcollide with the second group given as a SortedAxis and the
+    # same result: the sprites of group, in group order, each take every axis
+    # sprite they overlap that an earlier one has not killed.
+    # Returns {group sprite: [axis sprites]}
+    hits = {}
+    if not axis.sprites:
+        return hits
+    for sprite in group.sprites():
+        collision = spritecollide(sprite, axis, dokill_axis, collided)
+        if collision:
+            hits[sprite] = collision
+            if dokill_group:
+                sprite.kill()
+    return hits
@@ -0,0 +1,305 @@
+# Game class and main
+import os
+import random
+import pygame as pg
+from shmup.settings import *
+from shmup.sprites import *
+from shmup.broadphase import SortedAxis, groupcollide, spritecollide
+from common.rotation import RotationStrip
+from common.text import TextCache
+from common.assets import AssetLoader, ImageCache
+from common.particles import ParticleSystem, PARTICLES_AVAILABLE
+from common.sounds import SoundBank
+
+
+class Game:
+    # the simulation only moves forward through update(dt) with dt == STEP, so a
+    # headless game (no window, no sound) can be stepped as fast as the CPU allows
+    def __init__(self, headless=False):
+        self.headless = headless
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        # initialize game window & clock
+        pg.init()
+        if not headless:
+            pg.mixer.init()
+        self.screen = pg.display.set_mode((WIDTH, HEIGHT))
+        pg.display.set_caption(TITLE)
+        self.clock = pg.time.Clock()
+
+        # initialize directories
+        self.game_dir = os.path.dirname(__file__)
+        self.img_dir = os.path.join(self.game_dir, 'img')
+        self.snd_dir = os.path.join(self.game_dir, 'snd')
+
+        # initialize game variables
+        self.text_cache = TextCache(TEXT_CACHE_SIZE)
+        self.running = True
+        self.playing = False
+        self.game_over = False
+        self.random = random.Random()
+        self.controls = set()
+        self.time = 0
+        self.ticks = 0
+        self.score = 0
+        self.player = None
+        self.death_end = 0
+
+        # load all assets and data
+        self.load_data()
+
+    def load_data(self):
+        # decode all game graphics in parallel
+        cache = ImageCache(os.path.join(self.game_dir, ASSET_CACHE_DIR)) if ASSET_CACHE else None
+        loader = AssetLoader(ASSET_WORKERS, cache)
+        for filename in ['starfield.png', 'playerShip1_orange.png', 'laserRed16.png', 'shield_gold.png',
+                         'bolt_gold.png'] + MOB_IMAGES:
+            loader.image(filename, os.path.join(self.img_dir, filename), alpha=False)
+        loader.image('player_icon', os.path.join(self.img_dir, 'playerShip1_orange.png'), alpha=False, size=(25, 19))
+        for i in range(9):
+            filename = 'regularExplosion0{}.png'.format(i)
+            loader.image((filename, 'lg'), os.path.join(self.img_dir, filename), alpha=False, size=(75, 75))
+            loader.image((filename, 'sm'), os.path.join(self.img_dir, filename), alpha=False, size=(32, 32))
+            filename = 'sonicExplosion0{}.png'.format(i)
+            loader.image(filename, os.path.join(self.img_dir, filename), alpha=False)
+        assets = loader.load()
+        self.load_report = loader.report
+
+        # load all game graphics
+        self.background = assets['starfield.png']
+        self.background_rect = self.background.get_rect()
+        self.player_img = assets['playerShip1_orange.png']
+        self.player_icon = assets['player_icon']
+        self.player_icon.set_colorkey(BLACK)
+        self.bullet_img = assets['laserRed16.png']
+        # every meteor angle is rendered once into a strip, kept on disk next to the images
+        self.mob_strips = []
+        for img in MOB_IMAGES:
+            assets[img].set_colorkey(BLACK)
+            self.mob_strips.append(RotationStrip(assets[img], ROTATION_STEP, ROTATION_COLUMNS, cache,
+                                                 ('rotation', img), [os.path.join(self.img_dir, img)]))
+        if cache is not None:
+            cache.save()
+        self.explosion_animation = {}
+        self.explosion_animation['lg'] = []
+        self.explosion_animation['sm'] = []
+        self.explosion_animation['player'] = []
+        for i in range(9):
+            filename = 'regularExplosion0{}.png'.format(i)
+            self.explosion_animation['lg'].append(assets[(filename, 'lg')])
+            self.explosion_animation['sm'].append(assets[(filename, 'sm')])
+            self.explosion_animation['player'].append(assets['sonicExplosion0{}.png'.format(i)])
+        for frames in self.explosion_animation.values():
+            for image in frames:
+                image.set_colorkey(BLACK)
+        # every explosion is one particle, one array update and one blits call for all of them
+        self.particles = None
+        if PARTICLES and PARTICLES_AVAILABLE:
+            self.particles = ParticleSystem()
+            for size, frames in self.explosion_animation.items():
+                self.particles.add(size, frames, EXPLOSION_FRAME_TIME)
+        self.powerup_images = {}
+        self.powerup_images['shield'] = assets['shield_gold.png']
+        self.powerup_images['gun'] = assets['bolt_gold.png']
+
+        # register all game sounds, they are decoded on first play, a headless game has none
+        self.sounds = None
+        if self.headless:
+            return
+        self.sounds = SoundBank(SOUND_BANK_BYTES, ASSET_WORKERS)
+        for snd in EXPLOSION_SOUNDS + BULLET_SOUNDS + [PLAYER_EXPLOSION_SOUND] + list(POWERUP_SOUNDS.values()):
+            self.sounds.register(snd, os.path.join(self.snd_dir, snd))
+        # lasers and explosions play all the time, keep them decoded
+        self.sounds.preload(BULLET_SOUNDS + EXPLOSION_SOUNDS)
+        pg.mixer.music.load(os.path.join(self.snd_dir, BG_MUSIC))
+        pg.mixer.music.set_volume(0.4)
+
+    def play(self, sound):
+        if self.sounds is not None:
+            self.sounds.play(sound)
+
+    def new(self, seed=None):
+        # reinitialize game / start new game, the same seed and controls replay the same game
+        self.random = random.Random(seed)
+        self.time = 0
+        self.ticks = 0
+        self.game_over = False
+        self.all_sprites = pg.sprite.Group()
+        self.mobs = pg.sprite.Group()
+        self.bullets = pg.sprite.Group()
+        self.powerups = pg.sprite.Group()
+        self.player = Player(self)
+        self.all_sprites.add(self.player)
+        for i in range(MOB_COUNT):
+            self.spawn_mob()
+        self.score = 0
+        self.death_end = 0
+        if self.particles:
+            self.particles.clear()
+
+    def spawn_mob(self):
+        mob = Mob(self)
+        self.all_sprites.add(mob)
+        self.mobs.add(mob)
+
+    def spawn_bullet(self, x, y):
+        bullet = Bullet(self, x, y)
+        self.all_sprites.add(bullet)
+        self.bullets.add(bullet)
+
+    def spawn_explosion(self, center, size):
+        # returns the time the animation ends
+        if self.particles:
+            self.particles.emit(size, center)
+        else:
+            self.all_sprites.add(Explosion(self, center, size))
+        return self.time + len(self.explosion_animation[size]) * EXPLOSION_FRAME_TIME
+
+    def run(self):
+        # game loop, real time is fed into an accumulator and consumed in fixed steps
+        self.playing = True
+        accumulator = 0
+        while self.playing:
+            accumulator += self.clock.tick(FPS) / 1000
+            self.events()
+            steps = 0
+            while accumulator >= STEP and steps < MAX_STEPS:
+                self.update(STEP)
+                accumulator -= STEP
+                steps += 1
+            # a slow frame drops simulation time instead of spiralling
+            if steps == MAX_STEPS:
+                accumulator = 0
+            if self.game_over:
+                self.playing = False
+            self.draw()
+
+    def update(self, dt):
+        # one fixed simulation step
+        self.time += dt * 1000
+        self.ticks += 1
+        self.all_sprites.update(dt)
+        if self.particles:
+            self.particles.update(dt)
+
+        # check if a bullet hit a mob
+        hits = groupcollide(self.mobs, SortedAxis(self.bullets), True, True)
+        for hit in hits:
+            self.score += 50 - hit.radius
+            self.play(self.random.choice(EXPLOSION_SOUNDS))
+            self.spawn_explosion(hit.rect.center, 'lg')
+            if self.random.randrange(100) < POWERUP_DROP_PCT:
+                powerup = Powerup(self, hit.rect.center)
+                self.all_sprites.add(powerup)
+                self.powerups.add(powerup)
+            self.spawn_mob()
+
+        # check if player was hit by mob
+        hits = spritecollide(self.player, SortedAxis(self.mobs), True, pg.sprite.collide_circle)
+        for hit in hits:
+            self.player.shield -= hit.radius * 2
+            self.spawn_explosion(hit.rect.center, 'sm')
+            self.spawn_mob()
+            if self.player.shield <= 0:
+                self.play(PLAYER_EXPLOSION_SOUND)
+                self.death_end = self.spawn_explosion(self.player.rect.center, 'player')
+                self.player.hide()
+                self.player.lives -= 1
+                self.player.shield = PLAYER_SHIELD
+
+        # check if player hit a powerup
+        hits = pg.sprite.spritecollide(self.player, self.powerups, True)
+        for hit in hits:
+            self.play(POWERUP_SOUNDS[hit.type])
+            if hit.type == 'shield':
+                self.player.shield = min(self.player.shield + 20, PLAYER_SHIELD)
+            if hit.type == 'gun':
+                self.player.powerup()
+
+        # if the player died and the death animation has ended
+        if self.player.lives == 0 and self.time >= self.death_end:
+            self.game_over = True
+
+    def events(self):
+        # game loop - event handling section
+        for event in pg.event.get():
+            # check for closing window
+            if event.type == pg.QUIT:
+                self.playing = False
+                self.running = False
+        keys = pg.key.get_pressed()
+        self.controls = set()
+        if keys[pg.K_LEFT]:
+            self.controls.add('left')
+        if keys[pg.K_RIGHT]:
+            self.controls.add('right')
+        if keys[pg.K_SPACE]:
+            self.controls.add('fire')
+
+    def draw(self):
+        # game loop - draw section
+        self.screen.fill(BLACK)
+        self.screen.blit(self.background, self.background_rect)
+        self.all_sprites.draw(self.screen)
+        if self.particles:
+            self.particles.draw(self.screen)
+        self.draw_text(str(self.score), 20, WIDTH / 2, 10)
+        self.draw_shield_bar(5, 5, self.player.shield)
+        self.draw_lives(WIDTH - 100, 5, self.player.lives, self.player_icon)
+        # *after* drawing everything, flip the display
+        pg.display.flip()
+
+    def show_game_over_screen(self):
+        self.screen.blit(self.background, self.background_rect)
+        self.draw_text('SHMUP!', 64, WIDTH / 2, HEIGHT / 4)
+        self.draw_text('Arrow keys move, space fires.', 22, WIDTH / 2, HEIGHT / 2)
+        self.draw_text('Press any key to begin!', 18, WIDTH / 2, HEIGHT * 3 / 4)
+        pg.display.flip()
+        waiting = True
+        while waiting:
+            self.clock.tick(FPS)
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    waiting = False
+                    self.running = False
+                if event.type == pg.KEYUP:
+                    waiting = False
+
+    def draw_text(self, text, size, x, y):
+        text_surface = self.text_cache.render(text, FONT_ARIAL, size, WHITE)
+        text_rect = text_surface.get_rect()
+        text_rect.midtop = (x, y)
+        self.screen.blit(text_surface, text_rect)
+
+    def draw_shield_bar(self, x, y, percentage):
+        if percentage < 0:
+            percentage = 0
+        BAR_LENGTH = 100
+        BAR_HEIGHT = 10
+        fill = (percentage / 100) * BAR_LENGTH
+        outline_rect = pg.Rect(x, y, BAR_LENGTH, BAR_HEIGHT)
+        fill_rect = pg.Rect(x, y, fill, BAR_HEIGHT)
+        pg.draw.rect(self.screen, GREEN, fill_rect)
+        pg.draw.rect(self.screen, GREEN, outline_rect, 2)
+
+    def draw_lives(self, x, y, lives, image):
+        for i in range(lives):
+            image_rect = image.get_rect()
+            image_rect.x = x + 30 * i
+            image_rect.y = y
+            self.screen.blit(image, image_rect)
+
+
+if __name__ == '__main__':
+    game = Game()
+    # start background music
+    pg.mixer.music.play(loops=-1)
+    while game.running:
+        game.show_game_over_screen()
+        if not game.running:
+            break
+        game.new()
+        game.run()
+
+    pg.quit()
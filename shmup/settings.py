@@ -0,0 +1,70 @@
+import pygame as pg
+
+# Settings and constants
+TITLE = 'Shoot \'em up!'
+WIDTH = 480
+HEIGHT = 600
+FPS = 60
+
+# Simulation, the world always advances in fixed steps of STEP seconds and
+# all timers run on simulation time, rendering just shows the latest state
+STEP = 1 / FPS
+# steps per rendered frame before the simulation gives up catching up
+MAX_STEPS = 5
+
+# Player, speeds in pixels per second
+PLAYER_SPEED = 300
+PLAYER_SHIELD = 100
+PLAYER_LIVES = 3
+SHOOT_DELAY = 250
+HIDE_TIME = 1000
+POWERUP_TIME = 5000
+
+# Bullets and powerups
+BULLET_SPEED = 600
+POWERUP_SPEED = 180
+POWERUP_DROP_PCT = 3
+
+# Mobs
+MOB_COUNT = 8
+MOB_SPEED_X = range(-120, 120, 60)
+MOB_SPEED_Y = range(120, 360, 60)
+# degrees per rotation step, one step every MOB_ROTATION_TIME milliseconds
+MOB_ROTATION_SPEED = range(-8, 8)
+MOB_ROTATION_TIME = 50
+EXPLOSION_FRAME_TIME = 75
+# draw explosions with the vectorized particle system (falls back to sprites without NumPy)
+PARTICLES = True
+
+# Color definitions
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+
+# Fonts
+FONT_ARIAL = pg.font.match_font('arial')
+
+# Caches and asset loading
+# meteors are drawn from pre-rendered strips, one frame every ROTATION_STEP degrees
+ROTATION_STEP = 3
+ROTATION_COLUMNS = 12
+TEXT_CACHE_SIZE = 64
+ASSET_WORKERS = 4
+ASSET_CACHE = True
+ASSET_CACHE_DIR = '.assetcache'
+SOUND_BANK_BYTES = 4 * 1024 * 1024
+
+# Assets
+MOB_IMAGES = ['meteorBrown_big1.png', 'meteorBrown_big2.png', 'meteorBrown_med1.png', 'meteorBrown_med3.png',
+              'meteorBrown_small1.png', 'meteorBrown_small2.png', 'meteorBrown_tiny1.png']
+EXPLOSION_SOUNDS = ['explosion1.wav', 'explosion2.wav']
+BULLET_SOUNDS = ['laser1.wav', 'laser2.wav', 'laser3.wav']
+PLAYER_EXPLOSION_SOUND = 'player_explosion.wav'
+POWERUP_SOUNDS = {
+    'shield': 'powerup_shield.wav',
+    'gun': 'powerup_gun.wav'
+}
+BG_MUSIC = 'background_music.ogg'
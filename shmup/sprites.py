@@ -0,0 +1,175 @@
+# Sprite classes
+import pygame as pg
+from shmup.settings import *
+
+vector = pg.math.Vector2
+
+
+class Player(pg.sprite.Sprite):
+    def __init__(self, game):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.image = pg.transform.scale(game.player_img, (50, 38))
+        self.image.set_colorkey(BLACK)
+        self.rect = self.image.get_rect()
+        self.radius = int(self.rect.width * .85 / 2)
+        self.pos = vector(WIDTH / 2, HEIGHT - 20 - self.rect.height / 2)
+        self.rect.center = self.pos
+        self.speedx = 0
+        self.shield = PLAYER_SHIELD
+        self.last_shot = game.time
+        self.lives = PLAYER_LIVES
+        self.hidden = False
+        self.hide_timer = game.time
+        self.power = 1
+        self.power_timer = game.time
+
+    def update(self, dt):
+        # timeout for powerups
+        now = self.game.time
+        if self.power >= 2 and now - self.power_timer > POWERUP_TIME:
+            self.power -= 1
+            self.power_timer = now
+
+        # unhide if hidden
+        if self.hidden and now - self.hide_timer > HIDE_TIME:
+            self.hidden = False
+            self.pos = vector(WIDTH / 2, HEIGHT - 20 - self.rect.height / 2)
+
+        self.speedx = 0
+        controls = self.game.controls
+        if 'left' in controls:
+            self.speedx = -PLAYER_SPEED
+        if 'right' in controls:
+            self.speedx = PLAYER_SPEED
+        if 'fire' in controls:
+            self.shoot()
+        self.pos.x += self.speedx * dt
+        self.pos.x = min(max(self.pos.x, self.rect.width / 2), WIDTH - self.rect.width / 2)
+        self.rect.center = self.pos
+
+    def powerup(self):
+        self.power += 1
+        self.power_timer = self.game.time
+
+    def shoot(self):
+        now = self.game.time
+        if now - self.last_shot > SHOOT_DELAY:
+            self.last_shot = now
+            if self.power == 1:
+                self.game.spawn_bullet(self.rect.centerx, self.rect.top)
+            if self.power >= 2:
+                self.game.spawn_bullet(self.rect.left, self.rect.centery)
+                self.game.spawn_bullet(self.rect.right, self.rect.centery)
+            self.game.play(self.game.random.choice(BULLET_SOUNDS))
+
+    def hide(self):
+        # hide player temporarily
+        self.hidden = True
+        self.hide_timer = self.game.time
+        self.pos = vector(WIDTH / 2, HEIGHT + 200)
+        self.rect.center = self.pos
+
+
+class Mob(pg.sprite.Sprite):
+    def __init__(self, game):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.strip = game.random.choice(game.mob_strips)
+        self.image = self.strip.get(0)
+        self.rect = self.image.get_rect()
+        self.radius = int(self.strip.image.get_width() * .85 / 2)
+        self.pos = vector(0, 0)
+        self.vel = vector(0, 0)
+        self.spawn()
+        self.rotation = 0
+        self.rotation_speed = game.random.choice(MOB_ROTATION_SPEED)
+        self.last_update = game.time
+
+    def update(self, dt):
+        self.rotate()
+        self.pos += self.vel * dt
+        self.rect.center = self.pos
+        if self.rect.top > HEIGHT + 10 or self.rect.left < -50 or self.rect.right > WIDTH + 50:
+            self.spawn()
+
+    def spawn(self):
+        random = self.game.random
+        self.rect.x = random.randrange(0, WIDTH - self.rect.width)
+        self.rect.y = random.randrange(-150, -100)
+        self.pos = vector(self.rect.center)
+        self.vel = vector(random.choice(MOB_SPEED_X), random.choice(MOB_SPEED_Y))
+
+    def rotate(self):
+        now = self.game.time
+        if now - self.last_update > MOB_ROTATION_TIME:
+            self.last_update = now
+            self.rotation = (self.rotation + self.rotation_speed) % 360
+            # a lookup into the strip, the rect is resized in place around the center
+            index = self.strip.index(self.rotation)
+            self.image = self.strip.frames[index]
+            self.rect.size = self.strip.sizes[index]
+            self.rect.center = self.pos
+
+
+class Bullet(pg.sprite.Sprite):
+    def __init__(self, game, x, y):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.image = game.bullet_img
+        self.image.set_colorkey(BLACK)
+        self.rect = self.image.get_rect()
+        self.rect.bottom = y
+        self.rect.centerx = x
+        self.pos = vector(self.rect.center)
+
+    def update(self, dt):
+        self.pos.y -= BULLET_SPEED * dt
+        self.rect.center = self.pos
+        # destroy bullet if it goes off screen
+        if self.rect.bottom < 0:
+            self.kill()
+
+
+class Explosion(pg.sprite.Sprite):
+    def __init__(self, game, center, size):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.size = size
+        self.image = game.explosion_animation[self.size][0]
+        self.rect = self.image.get_rect()
+        self.rect.center = center
+        self.frame = 0
+        self.last_update = game.time
+
+    def update(self, dt):
+        now = self.game.time
+        if now - self.last_update > EXPLOSION_FRAME_TIME:
+            self.last_update = now
+            self.frame += 1
+            if self.frame == len(self.game.explosion_animation[self.size]):
+                self.kill()
+            else:
+                center = self.rect.center
+                self.image = self.game.explosion_animation[self.size][self.frame]
+                self.rect = self.image.get_rect()
+                self.rect.center = center
+
+
+class Powerup(pg.sprite.Sprite):
+    def __init__(self, game, center):
+        pg.sprite.Sprite.__init__(self)
+        self.game = game
+        self.type = game.random.choice(['shield', 'gun'])
+        self.image = game.powerup_images[self.type]
+        self.image.set_colorkey(BLACK)
+        self.rect = self.image.get_rect()
+        self.rect.center = center
+        self.pos = vector(self.rect.center)
+
+    def update(self, dt):
+        self.pos.y += POWERUP_SPEED * dt
+        self.rect.center = self.pos
+        # destroy powerup if it goes off screen
+        if self.rect.top > HEIGHT:
+            self.kill()
@@ -0,0 +1,198 @@
+# Headless, deterministic benchmark of the game loop
+# run from the repository root: python -m tilebased_shooter.benchmark --frames 2000
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+
+def heading(player, pos):
+    # degrees player has to turn to face pos, player.rot counts counter clockwise on screen
+    offset = pos - player.pos
+    angle = math.degrees(math.atan2(-offset.y, offset.x))
+    return (angle - player.rot + 180) % 360 - 180
+
+
+def waypoint(field, pos):
+    # center of the next tile on the way from the flow field's target (the player) to pos,
+    # found by following the mobs' path from pos back to the last tile before the player's
+    columns = field.columns
+    x, y = field.tile_of(pos)
+    if field.distance[y * columns + x] < 1:
+        return pos
+    while True:
+        direction = field.directions[y * columns + x]
+        next_x = x + (direction.x > 0.1) - (direction.x < -0.1)
+        next_y = y + (direction.y > 0.1) - (direction.y < -0.1)
+        if field.distance[next_y * columns + next_x] == 0:
+            return type(pos)((x + 0.5) * field.tile_size, (y + 0.5) * field.tile_size)
+        x, y = next_x, next_y
+
+
+class Autopilot:
+    # scripted input: walk the flow field towards the closest reachable zombie and
+    # fire once it is in front. Zombies beyond the game's flow field range are hunted
+    # through a field of its own, searched outward from the zombie instead
+    def __init__(self, game):
+        from tilebased_shooter.flowfield import FlowField
+
+        field = game.flow_field
+        self.hunt = FlowField(game.map.width, game.map.height, field.tile_size, game.wall_hash,
+                              max_range=field.columns + field.rows, blocked=field.blocked)
+
+    def __call__(self, game):
+        player = game.player
+        field = game.flow_field
+
+        def steps(mob):
+            x, y = field.tile_of(mob.pos)
+            if 0 <= x < field.columns and 0 <= y < field.rows:
+                return field.distance[y * field.columns + x]
+            return -1
+
+        reachable = [mob for mob in game.mobs if steps(mob) >= 0]
+        close = False
+        if reachable:
+            target = min(reachable, key=steps)
+            # a couple of tiles along the path, nothing (much) in between
+            close = steps(target) <= 2
+            goal = target.pos if close else waypoint(field, target.pos)
+        else:
+            target = min(game.mobs, key=lambda mob: (mob.pos - player.pos).length_squared(), default=None)
+            if target is None:
+                return set()
+            self.hunt.update(target.pos)
+            direction = self.hunt.direction(player.pos)
+            if direction is None:
+                # walled in or on the zombie's tile, look around
+                return {'left', 'fire'}
+            goal = player.pos + direction * field.tile_size
+        aim = heading(player, target.pos)
+        turn = heading(player, goal)
+        controls = set()
+        if turn > 10:
+            controls.add('left')
+        elif turn < -10:
+            controls.add('right')
+        if (not close or (target.pos - player.pos).length() > 120) and abs(turn) < 45:
+            controls.add('forward')
+        if close and abs(aim) < 15:
+            controls.add('fire')
+        return controls
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values):
+    # milliseconds
+    return {
+        'mean': sum(values) / len(values) * 1000,
+        'p50': percentile(values, 50) * 1000,
+        'p95': percentile(values, 95) * 1000,
+        'p99': percentile(values, 99) * 1000,
+        'max': max(values) * 1000
+    }
+
+
+def load_times(report):
+    # decode + convert time per asset kind, the per size flash entries alone are over a hundred
+    times = {}
+    for entry in report:
+        times[entry['kind']] = times.get(entry['kind'], 0) + entry['decode_ms'] + entry['convert_ms']
+    return times
+
+
+def run(map_name='map.tmx', frames=1000, warmup=60, seed=0, dt=1 / 60, idle=False):
+    # no window, no sound card, scripted or no player input
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    # keep stdout clean for the JSON report
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    from tilebased_shooter.main import Game
+    from tilebased_shooter.profiler import FrameProfiler, PHASE_COLORS
+
+    random.seed(seed)
+    game = Game()
+    game.new(map_name)
+    game.playing = True
+    # fixed timestep instead of clock.tick(FPS), all game timers run on game.time
+    game.dt = dt
+    if not idle:
+        game.autopilot = Autopilot(game)
+
+    def tick():
+        # a cleared level or a dead player starts the map again, returns the bullets of a finished game
+        game.tick()
+        if not game.playing:
+            fired = game.bullet_pool.created + game.bullet_pool.reused
+            game.new(map_name)
+            game.playing = True
+            return fired
+        return None
+
+    for frame in range(warmup):
+        tick()
+    # the profiler ring buffer holds every measured frame
+    game.profiler = FrameProfiler(frames)
+    games = 0
+    bullets = 0
+    start = time.perf_counter()
+    for frame in range(frames):
+        fired = tick()
+        if fired is not None:
+            games += 1
+            bullets += fired
+    elapsed = time.perf_counter() - start
+    bullets += game.bullet_pool.created + game.bullet_pool.reused
+
+    recorded = list(game.profiler.frames)
+    phases = {name: [frame.get(name, 0) for frame in recorded] for name in PHASE_COLORS}
+
+    return {
+        'map': map_name,
+        'frames': frames,
+        'seed': seed,
+        'dt': dt,
+        'idle': idle,
+        'games': games,
+        'mobs_left': len(game.mobs),
+        'player_health': game.player.health,
+        'bullets_fired': bullets,
+        'load_ms': load_times(game.load_report),
+        'load_wall_ms': game.load_report[-1]['wall_ms'],
+        'sound_bank': game.sounds.stats(),
+        'ticks_per_sec': frames / elapsed,
+        'frame_ms': summarize([frame['total'] for frame in recorded]),
+        'phases_ms': {name: summarize(values) for name, values in phases.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run tilebased_shooter headless and report frame timings as JSON.')
+    parser.add_argument('--map', default='map.tmx', help='TMX file, relative to the map folder or absolute')
+    parser.add_argument('--frames', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dt', type=float, default=1 / 60)
+    parser.add_argument('--idle', action='store_true', help='no input instead of the autopilot')
+    parser.add_argument('--output', help='write the report to this file instead of stdout')
+    args = parser.parse_args()
+
+    report = run(args.map, args.frames, args.warmup, args.seed, args.dt, args.idle)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from collections import deque
+from tilebased_shooter.settings import *
+from tilebased_shooter.spatial import SpatialHash
+
+
+class Decal:
+    def __init__(self, image, pos, order):
+        self.image = image
+        self.rect = image.get_rect(topleft=(int(pos[0]), int(pos[1])))
+        self.order = order
+
+
+class DecalLayer:
+    # images painted on the ground (splats): at most max_decals are kept, oldest
+    # evicted first, and they are either drawn per frame when in view or baked
+    # into the map renderer's chunks
+    def __init__(self, renderer, max_decals=MAX_DECALS, cell_size=DECAL_HASH_CELL, bake=DECAL_BAKE):
+        self.renderer = renderer
+        self.max_decals = max_decals
+        self.bake = bake
+        self.decals = deque()
+        self.grid = SpatialHash(cell_size)
+        self.counter = 0
+        if bake:
+            renderer.decals = self
+
+    def add(self, image, pos):
+        self.counter += 1
+        decal = Decal(image, pos, self.counter)
+        self.decals.append(decal)
+        self.grid.add(decal)
+        if self.bake:
+            self.renderer.bake(decal)
+        while len(self.decals) > self.max_decals:
+            oldest = self.decals.popleft()
+            self.grid.remove(oldest)
+            if self.bake:
+                # chunks re-render from the pristine map without it
+                self.renderer.invalidate(oldest.rect)
+        return decal
+
+    def in_rect(self, rect):
+        # decals overlapping rect, oldest first so newer ones paint on top
+        decals = self.grid.collide(rect)
+        decals.sort(key=lambda decal: decal.order)
+        return decals
+
+    def draw(self, surface, camera):
+        if self.bake:
+            return
+        for decal in self.in_rect(camera.view()):
+            surface.blit(decal.image, camera.apply_rect(decal.rect))
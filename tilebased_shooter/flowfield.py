@@ -0,0 +1,128 @@
+from collections import deque
+import pygame as pg
+from tilebased_shooter.settings import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+vector = pg.math.Vector2
+
+ORTHOGONAL = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIAGONAL = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+class FlowField:
+    # shared pathfinding for all mobs: a breadth first search outward from the
+    # target's tile stores, for every tile within range, the direction of the
+    # neighbouring tile that is one step closer to the target. Pass the blocked
+    # grid of an earlier field on the same walls to skip scanning them again
+    def __init__(self, width, height, tile_size, walls, max_range=FLOW_FIELD_RANGE, blocked=None):
+        self.tile_size = tile_size
+        self.columns = int(-(-width // tile_size))
+        self.rows = int(-(-height // tile_size))
+        self.max_range = max_range
+        if blocked is None:
+            blocked = blocked_tiles(self.columns, self.rows, tile_size, walls)
+        self.blocked = blocked
+        self.distance = [-1] * (self.columns * self.rows)
+        self.directions = [None] * (self.columns * self.rows)
+        # the same directions as arrays for vectorized consumers, headings is
+        # only meaningful where known is set
+        if np is not None:
+            self.headings = np.zeros((self.columns * self.rows, 2))
+            self.known = np.zeros(self.columns * self.rows, dtype=bool)
+        else:
+            self.headings = self.known = None
+        self.visited = []
+        self.target = None
+
+    def tile_of(self, pos):
+        return int(pos[0] // self.tile_size), int(pos[1] // self.tile_size)
+
+    def update(self, pos):
+        # only search again once the target enters another tile
+        tile = self.tile_of(pos)
+        if tile == self.target:
+            return
+        self.target = tile
+        self.compute()
+
+    def compute(self):
+        columns = self.columns
+        distance = self.distance
+        directions = self.directions
+        blocked = self.blocked
+
+        # reset only the tiles reached by the previous search
+        for i in self.visited:
+            distance[i] = -1
+            directions[i] = None
+        if self.known is not None:
+            self.known[self.visited] = False
+        self.visited = []
+
+        tx, ty = self.target
+        if not (0 <= tx < columns and 0 <= ty < self.rows):
+            return
+        start = ty * columns + tx
+        distance[start] = 0
+        self.visited.append(start)
+        frontier = deque([(tx, ty)])
+        while frontier:
+            x, y = frontier.popleft()
+            d = distance[y * columns + x] + 1
+            if d > self.max_range:
+                continue
+            for dx, dy in ORTHOGONAL:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < columns and 0 <= ny < self.rows:
+                    i = ny * columns + nx
+                    if distance[i] < 0 and not blocked[i]:
+                        distance[i] = d
+                        self.visited.append(i)
+                        frontier.append((nx, ny))
+
+        # point every reached tile at its closest neighbour, diagonals only if no corner is cut
+        pointed = []
+        for i in self.visited:
+            if i == start:
+                continue
+            x, y = i % columns, i // columns
+            best = None
+            best_distance = distance[i]
+            for dx, dy in ORTHOGONAL + DIAGONAL:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < columns and 0 <= ny < self.rows):
+                    continue
+                n = ny * columns + nx
+                if distance[n] < 0 or distance[n] >= best_distance:
+                    continue
+                if dx and dy and (blocked[y * columns + nx] or blocked[ny * columns + x]):
+                    continue
+                best = (dx, dy)
+                best_distance = distance[n]
+            if best:
+                directions[i] = vector(best).normalize()
+                pointed.append(i)
+        if self.known is not None and pointed:
+            self.headings[pointed] = [(directions[i].x, directions[i].y) for i in pointed]
+            self.known[pointed] = True
+
+    def direction(self, pos):
+        # unit vector to follow from pos, None outside the searched area or on the target tile
+        x, y = self.tile_of(pos)
+        if 0 <= x < self.columns and 0 <= y < self.rows:
+            return self.directions[y * self.columns + x]
+        return None
+
+
+def blocked_tiles(columns, rows, tile_size, walls):
+    # a tile counts as blocked if a wall covers its center area
+    blocked = []
+    for y in range(rows):
+        for x in range(columns):
+            rect = pg.Rect(x * tile_size, y * tile_size, tile_size, tile_size)
+            blocked.append(walls.collideany(rect.inflate(-tile_size // 2, -tile_size // 2)) is not None)
+    return blocked
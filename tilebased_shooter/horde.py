@@ -0,0 +1,233 @@
+# Batched mob simulation: mob state lives in NumPy arrays and all mobs are
+# advanced in one vectorized step, BatchedMob sprites only render the result
+import random
+from types import SimpleNamespace
+import pygame as pg
+from tilebased_shooter.settings import *
+from tilebased_shooter.sprites import Mob, collide_with_walls
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+vector = pg.math.Vector2
+
+HORDE_AVAILABLE = np is not None
+
+# neighbour cell offsets of the separation grid, packed the same way as the cell keys
+KEY_STRIDE = 1 << 20
+NEIGHBOUR_OFFSETS = [dx * KEY_STRIDE + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class Horde:
+    def __init__(self, game, capacity=256):
+        self.game = game
+        self.count = 0
+        self.mobs = []
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.rot = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.health = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.wall_cells = None
+
+    def arrays(self):
+        return self.pos, self.vel, self.rot, self.speed, self.health, self.active
+
+    def grow(self):
+        capacity = len(self.rot) * 2
+        for name in ['pos', 'vel', 'rot', 'speed', 'health', 'active']:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, mob):
+        if self.count == len(self.rot):
+            self.grow()
+        mob.index = self.count
+        self.mobs.append(mob)
+        self.count += 1
+        for array in self.arrays():
+            array[mob.index] = 0
+
+    def remove(self, mob):
+        # swap the last row into the hole to keep the arrays packed
+        index = mob.index
+        last = self.count - 1
+        if index != last:
+            for array in self.arrays():
+                array[index] = array[last]
+            moved = self.mobs[last]
+            moved.index = index
+            self.mobs[index] = moved
+        self.mobs.pop()
+        self.count -= 1
+        mob.index = None
+
+    def index_walls(self, wall_hash, width, height):
+        # boolean grid of wall hash cells, so only mobs near a wall run the exact wall test
+        size = wall_hash.cell_size
+        self.wall_cells = np.zeros((int(width // size) + 2, int(height // size) + 2), dtype=bool)
+        for x, y in wall_hash.cells:
+            if 0 <= x < self.wall_cells.shape[0] and 0 <= y < self.wall_cells.shape[1]:
+                self.wall_cells[x, y] = True
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        target = self.game.player.pos
+        to_target = np.array([target.x, target.y]) - pos
+        active = (to_target ** 2).sum(axis=1) < MOB_DETECT_RAD ** 2
+        self.active[:n] = active
+        index = np.flatnonzero(active)
+        if len(index) == 0:
+            return
+
+        # face and accelerate along the flow field, or towards the target where it has no direction
+        heading = self.flow_headings(index, to_target[index])
+        self.rot[index] = -np.degrees(np.arctan2(heading[:, 1], heading[:, 0]))
+        length = np.hypot(heading[:, 0], heading[:, 1])
+        acc = np.where(length[:, None] > 0, heading / np.maximum(length, 1e-9)[:, None], [1.0, 0.0])
+        acc += self.separation(index)
+        length = np.hypot(acc[:, 0], acc[:, 1])
+        acc *= (self.speed[index] / np.where(length > 0, length, 1))[:, None]
+
+        # equations of motion
+        acc -= vel[index]
+        vel[index] += acc * dt
+        pos[index] += vel[index] * dt + 0.5 * acc * dt ** 2
+        self.collide_walls(index)
+
+    def flow_headings(self, index, to_target):
+        field = self.game.flow_field
+        tiles = (self.pos[index] // field.tile_size).astype(int)
+        inside = ((tiles[:, 0] >= 0) & (tiles[:, 0] < field.columns) &
+                  (tiles[:, 1] >= 0) & (tiles[:, 1] < field.rows))
+        tile_index = np.where(inside, tiles[:, 1] * field.columns + tiles[:, 0], 0)
+        known = inside & field.known[tile_index]
+        return np.where(known[:, None], field.headings[tile_index], to_target)
+
+    def separation(self, index):
+        # vectorized Mob.avoid_mobs: bucket all mobs into MOB_AVOID_RAD cells and
+        # expand every active mob against the mobs of its 3x3 neighbouring cells
+        pos = self.pos[:self.count]
+        cells = np.floor(pos / MOB_AVOID_RAD).astype(np.int64)
+        keys = cells[:, 0] * KEY_STRIDE + cells[:, 1]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+
+        rows = np.tile(np.arange(len(index)), len(NEIGHBOUR_OFFSETS))
+        targets = (keys[index][None, :] + np.array(NEIGHBOUR_OFFSETS)[:, None]).ravel()
+        start = np.searchsorted(sorted_keys, targets, 'left')
+        counts = np.searchsorted(sorted_keys, targets, 'right') - start
+        total = counts.sum()
+        push = np.zeros((len(index), 2))
+        if total == 0:
+            return push
+        rows = np.repeat(rows, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        others = order[np.repeat(start, counts) + offsets]
+
+        dist = pos[index[rows]] - pos[others]
+        length = np.hypot(dist[:, 0], dist[:, 1])
+        near = (length > 0) & (length < MOB_AVOID_RAD)
+        rows = rows[near]
+        dist = dist[near] / length[near, None]
+        push[:, 0] = np.bincount(rows, dist[:, 0], len(index))
+        push[:, 1] = np.bincount(rows, dist[:, 1], len(index))
+        return push
+
+    def collide_walls(self, index):
+        if self.wall_cells is None:
+            return
+        pos = self.pos
+        size = self.game.wall_hash.cell_size
+        half_w = MOB_HIT_RECT.width / 2
+        half_h = MOB_HIT_RECT.height / 2
+        max_x = self.wall_cells.shape[0] - 1
+        max_y = self.wall_cells.shape[1] - 1
+        left = np.clip((pos[index, 0] - half_w) // size, 0, max_x).astype(int)
+        right = np.clip((pos[index, 0] + half_w) // size, 0, max_x).astype(int)
+        top = np.clip((pos[index, 1] - half_h) // size, 0, max_y).astype(int)
+        bottom = np.clip((pos[index, 1] + half_h) // size, 0, max_y).astype(int)
+        near_wall = (self.wall_cells[left, top] | self.wall_cells[right, top] |
+                     self.wall_cells[left, bottom] | self.wall_cells[right, bottom])
+
+        # exact per-mob resolution with the same code path as the sprite mobs
+        for i in index[near_wall]:
+            mob = self.mobs[i]
+            body = SimpleNamespace(pos=vector(*pos[i]), vel=vector(*self.vel[i]), hit_rect=mob.hit_rect)
+            body.hit_rect.centerx = body.pos.x
+            collide_with_walls(body, self.game.wall_hash, 'x')
+            body.hit_rect.centery = body.pos.y
+            collide_with_walls(body, self.game.wall_hash, 'y')
+            pos[i] = body.pos
+            self.vel[i] = body.vel
+
+
+def horde_column(name):
+    def get(self):
+        return getattr(self.horde, name)[self.index]
+
+    def set(self, value):
+        getattr(self.horde, name)[self.index] = value
+
+    return property(get, set)
+
+
+def horde_vector(name):
+    # reads return a copy of the row, only assigning a whole vector writes it back.
+    # mob.pos = ... and mob.pos += ... (which assigns) work, component writes like
+    # mob.pos.x = ... or in place methods like rotate_ip() change the copy and are lost
+    def get(self):
+        return vector(*getattr(self.horde, name)[self.index])
+
+    def set(self, value):
+        getattr(self.horde, name)[self.index] = (value[0], value[1])
+
+    return property(get, set)
+
+
+class BatchedMob(Mob):
+    # thin sprite view over one row of the Horde arrays, the arrays are the only
+    # writable state: pos and vel are read-only copies unless assigned as a whole,
+    # so code that moves a mob component by component (collide_with_walls) has to
+    # work on a copy and assign it back, as Horde.collide_walls does
+    pos = horde_vector('pos')
+    vel = horde_vector('vel')
+    rot = horde_column('rot')
+    speed = horde_column('speed')
+    health = horde_column('health')
+
+    def __init__(self, game, x, y):
+        self.horde = game.horde
+        self.horde.add(self)
+        Mob.__init__(self, game, x, y)
+
+    def update(self):
+        horde = self.horde
+        i = self.index
+        x, y = horde.pos[i]
+        if horde.active[i]:
+            if random.random() < 0.002:
+                self.game.sounds.play(random.choice(ZOMBIE_MOAN_SOUNDS))
+            self.image = self.game.rotation_cache.get(self.game.mob_img, horde.rot[i])
+            self.rect = self.image.get_rect()
+        self.hit_rect.center = (x, y)
+        self.rect.center = self.hit_rect.center
+        # kill if no more health
+        if horde.health[i] <= 0:
+            self.game.sounds.play(random.choice(ZOMBIE_HIT_SOUNDS))
+            self.kill()
+            self.game.decals.add(self.game.splat_img, (x - 32, y - 32))
+
+    def kill(self):
+        if self.index is not None:
+            self.horde.remove(self)
+        Mob.kill(self)
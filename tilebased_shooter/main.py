@@ -1,9 +1,21 @@
 import os
 import sys
+import time
 import pygame as pg
 from tilebased_shooter.settings import *
 from tilebased_shooter.sprites import *
 from tilebased_shooter.map import *
+from tilebased_shooter.spatial import *
+from tilebased_shooter.horde import *
+from tilebased_shooter.profiler import *
+from tilebased_shooter.pool import *
+from tilebased_shooter.flowfield import *
+from tilebased_shooter.decals import *
+from common.rotation import RotationCache
+from common.text import TextCache
+from common.assets import AssetLoader, ImageCache
+from common.particles import ParticleSystem, PARTICLES_AVAILABLE
+from common.sounds import SoundBank
 
 
 # HUD functions
@@ -45,11 +57,18 @@ class Game:
 
         # load image and sound data
         self.load_data()
+        self.rotation_cache = RotationCache(ROTATION_STEP, ROTATION_CACHE_SIZE)
+        self.rotation_cache.prerender(self.player_img)
+        self.rotation_cache.prerender(self.mob_img)
+        self.text_cache = TextCache(TEXT_CACHE_SIZE)
 
         # define sprite groups
         self.all_sprites = None
         self.walls = None
+        self.wall_hash = None
         self.mobs = None
+        self.mob_hash = None
+        self.horde = None
         self.bullets = None
         self.items = None
 
@@ -57,57 +76,78 @@ class Game:
         self.running = True
         self.playing = False
         self.paused = None
+        # simulated milliseconds, the sum of every unpaused frame's dt
+        self.time = 0
+        # callable(game) returning the held controls, replaces the keyboard when set
+        self.autopilot = None
         self.draw_debug = None
         self.camera = None
+        self.drawn_sprites = 0
+        self.culled_sprites = 0
+        self.profiler = FrameProfiler()
+        self.draw_profiler = False
 
     def load_data(self):
         self.title_font = os.path.join(self.img_dir, 'ZOMBIE.TTF')
         self.hud_font = os.path.join(self.img_dir, 'Impacted2.0.ttf')
         self.dim_screen = pg.Surface(self.screen.get_size()).convert_alpha()
         self.dim_screen.fill((0, 0, 0, 180))
-        self.player_img = pg.image.load(os.path.join(self.img_dir, PLAYER_IMAGE)).convert_alpha()
-        self.wall_img = pg.image.load(os.path.join(self.img_dir, WALL_IMAGE)).convert_alpha()
-        self.wall_img = pg.transform.scale(self.wall_img, (TILESIZE, TILESIZE))
-        self.mob_img = pg.image.load(os.path.join(self.img_dir, MOB_IMAGE)).convert_alpha()
+
+        # decode all images in parallel, scaled images come from the cache on warm starts
+        cache = ImageCache(os.path.join(self.game_dir, ASSET_CACHE_DIR)) if ASSET_CACHE else None
+        loader = AssetLoader(ASSET_WORKERS, cache)
+        loader.image('player', os.path.join(self.img_dir, PLAYER_IMAGE))
+        loader.image('wall', os.path.join(self.img_dir, WALL_IMAGE), size=(TILESIZE, TILESIZE))
+        loader.image('mob', os.path.join(self.img_dir, MOB_IMAGE))
+        loader.image(('bullet', 'lg'), os.path.join(self.img_dir, BULLET_IMG))
+        loader.image(('bullet', 'sm'), os.path.join(self.img_dir, BULLET_IMG), size=(10, 10))
+        loader.image('splat', os.path.join(self.img_dir, SPLAT_IMG), size=(64, 64))
+        for img in MUZZLE_FLASHES:
+            for size in FLASH_SIZES:
+                loader.image(('flash', img, size), os.path.join(self.img_dir, img), size=(size, size))
+        for item in ITEM_IMAGES:
+            loader.image(('item', item), os.path.join(self.img_dir, ITEM_IMAGES[item]))
+        assets = loader.load()
+        self.load_report = loader.report
+        if PRINT_LOAD_REPORT:
+            loader.print_report()
+
+        self.player_img = assets['player']
+        self.wall_img = assets['wall']
+        self.mob_img = assets['mob']
         self.bullet_images = {}
-        self.bullet_images['lg'] = pg.image.load(os.path.join(self.img_dir, BULLET_IMG)).convert_alpha()
-        self.bullet_images['sm'] = pg.transform.scale(self.bullet_images['lg'], (10, 10))
-        self.splat_img = pg.image.load(os.path.join(self.img_dir, SPLAT_IMG)).convert_alpha()
-        self.splat_img = pg.transform.scale(self.splat_img, (64, 64))
-        self.gun_flashes = []
+        self.bullet_images['lg'] = assets[('bullet', 'lg')]
+        self.bullet_images['sm'] = assets[('bullet', 'sm')]
+        self.splat_img = assets['splat']
+        self.scaled_gun_flashes = []
         for img in MUZZLE_FLASHES:
-            self.gun_flashes.append(pg.image.load(os.path.join(self.img_dir, img)).convert_alpha())
+            for size in FLASH_SIZES:
+                self.scaled_gun_flashes.append(assets[('flash', img, size)])
+        # each flash image is a one frame particle animation
+        self.particles = None
+        if PARTICLES and PARTICLES_AVAILABLE:
+            self.particles = ParticleSystem()
+            for i, image in enumerate(self.scaled_gun_flashes):
+                self.particles.add(('flash', i), [image], FLASH_DURATION)
         self.item_images = {}
         for item in ITEM_IMAGES:
-            self.item_images[item] = pg.image.load(os.path.join(self.img_dir, ITEM_IMAGES[item])).convert_alpha()
+            self.item_images[item] = assets[('item', item)]
 
-        # load music and sound effects
+        # load music, sound effects are registered by file name and decoded on first play
         pg.mixer.music.load(os.path.join(self.mus_dir, BG_MUSIC))
-        self.effects_sounds = {}
-        for type in EFFECTS_SOUNDS:
-            self.effects_sounds[type] = pg.mixer.Sound(os.path.join(self.snd_dir, EFFECTS_SOUNDS[type]))
-        self.weapon_sounds = {}
+        self.sounds = SoundBank(SOUND_BANK_BYTES, ASSET_WORKERS)
+        for snd in list(EFFECTS_SOUNDS.values()) + PLAYER_HIT_SOUNDS + ZOMBIE_HIT_SOUNDS:
+            self.sounds.register(snd, os.path.join(self.snd_dir, snd))
         for weapon in WEAPON_SOUNDS:
-            self.weapon_sounds[weapon] = []
             for snd in WEAPON_SOUNDS[weapon]:
-                s = pg.mixer.Sound(os.path.join(self.snd_dir, snd))
-                s.set_volume(0.3)
-                self.weapon_sounds[weapon].append(s)
-        self.zombie_moan_sounds = []
+                self.sounds.register(snd, os.path.join(self.snd_dir, snd), 0.3)
         for snd in ZOMBIE_MOAN_SOUNDS:
-            sound = pg.mixer.Sound(os.path.join(self.snd_dir, snd))
-            sound.set_volume(0.1)
-            self.zombie_moan_sounds.append(sound)
-        self.player_hit_sounds = []
-        for snd in PLAYER_HIT_SOUNDS:
-            self.player_hit_sounds.append(pg.mixer.Sound(path.join(self.snd_dir, snd)))
-        self.zombie_hit_sounds = []
-        for snd in ZOMBIE_HIT_SOUNDS:
-            self.zombie_hit_sounds.append(pg.mixer.Sound(path.join(self.snd_dir, snd)))
+            self.sounds.register(snd, os.path.join(self.snd_dir, snd), 0.1)
+        # gunshots play constantly, keep them decoded
+        self.sounds.preload([snd for weapon in WEAPON_SOUNDS for snd in WEAPON_SOUNDS[weapon]])
 
     def draw_text(self, text, font_name, size, color, x, y, align="nw"):
-        font = pg.font.Font(font_name, size)
-        text_surface = font.render(text, True, color)
+        text_surface = self.text_cache.render(text, font_name, size, color)
         text_rect = text_surface.get_rect()
         if align == "nw":
             text_rect.topleft = (x, y)
@@ -129,18 +169,25 @@ class Game:
             text_rect.center = (x, y)
         self.screen.blit(text_surface, text_rect)
 
-    def new(self):
+    def new(self, map_name='map.tmx'):
         # init map
-        self.map = TiledMap(os.path.join(self.map_dir, 'map.tmx'))
-        self.map_img = self.map.make_map()
-        self.map_rect = self.map_img.get_rect()
+        # parsed once per process, restarts reuse the map and its pristine chunks
+        self.map = load_tiled_map(os.path.join(self.map_dir, map_name))
+        self.map_renderer = ChunkedMapRenderer(self.map)
+        self.decals = DecalLayer(self.map_renderer)
 
         # initialize sprite groups
-        self.all_sprites = pg.sprite.LayeredUpdates()
+        self.all_sprites = CulledLayeredUpdates(DRAW_HASH_CELL)
         self.walls = pg.sprite.Group()
         self.mobs = pg.sprite.Group()
         self.bullets = pg.sprite.Group()
         self.items = pg.sprite.Group()
+        self.bullet_pool = SpritePool(Bullet, self)
+        self.flash_pool = SpritePool(MuzzleFlash, self)
+        if self.particles:
+            self.particles.clear()
+        self.horde = Horde(self) if BATCHED_MOBS and HORDE_AVAILABLE else None
+        mob_class = BatchedMob if self.horde else Mob
 
         # initialize sprites
         # for row, tiles in enumerate(self.map.data):
@@ -152,22 +199,34 @@ class Game:
         #         if tile == 'M':
         #             Mob(self, col, row)
 
-        for tile_object in self.map.tmx_data.objects:
+        for tile_object in self.map.objects:
             object_center = vector(tile_object.x + tile_object.width / 2, tile_object.y + tile_object.height / 2)
             if tile_object.name == 'player':
                 self.player = Player(self, object_center.x, object_center.y)
             if tile_object.name == 'zombie':
-                Mob(self, object_center.x, object_center.y)
+                mob_class(self, object_center.x, object_center.y)
             if tile_object.name == 'wall':
                 Obstacle(self, tile_object.x, tile_object.y, tile_object.width, tile_object.height)
             if tile_object.name in ['health', 'shotgun']:
                 Item(self, object_center, tile_object.name)
 
+        # walls never move, so index them once for the collision broadphase
+        self.wall_hash = SpatialHash(WALL_HASH_CELL)
+        for wall in self.walls:
+            self.wall_hash.add(wall)
+        self.mob_hash = SpatialHash(MOB_HASH_CELL)
+        self.flow_field = FlowField(self.map.width, self.map.height, TILESIZE, self.wall_hash,
+                                    blocked=self.map.blocked_tiles.get(TILESIZE))
+        self.map.blocked_tiles[TILESIZE] = self.flow_field.blocked
+        if self.horde:
+            self.horde.index_walls(self.wall_hash, self.map.width, self.map.height)
+
         # initialize camera with total map size
         self.camera = Camera(self.map.width, self.map.height)
         self.draw_debug = False
         self.paused = False
-        self.effects_sounds['level_start'].play()
+        self.time = 0
+        self.sounds.play(EFFECTS_SOUNDS['level_start'])
 
     def run(self):
         # game loop
@@ -175,10 +234,17 @@ class Game:
         pg.mixer.music.play(loops=-1)
         while self.playing:
             self.dt = self.clock.tick(FPS) / 1000
+            self.tick()
+
+    def tick(self):
+        # one frame of the game loop, timed phase by phase
+        self.profiler.begin_frame()
+        with self.profiler.phase('events'):
             self.events()
-            if not self.paused:
-                self.update()
-            self.draw()
+        if not self.paused:
+            self.update()
+        self.draw()
+        self.profiler.end_frame()
 
     def quit(self):
         pg.quit()
@@ -186,30 +252,55 @@ class Game:
 
     def update(self):
         # game loop - update section
-        self.all_sprites.update()
-        self.camera.update(self.player)
+        self.time += self.dt * 1000
+        with self.profiler.phase('update_sprites'):
+            # one path search per player tile change, shared by every mob
+            self.flow_field.update(self.player.pos)
+            if self.horde:
+                # advance all batched mobs at once, their sprites only sync in update()
+                self.horde.update(self.dt)
+            else:
+                # rebuild the mob neighbour grid used by Mob.avoid_mobs
+                self.mob_hash.clear()
+                for mob in self.mobs:
+                    self.mob_hash.add_point(mob, mob.pos.x, mob.pos.y)
+            # age the particles before the sprites emit new ones, a flash is drawn from age 0
+            if self.particles:
+                self.particles.update(self.dt)
+            self.all_sprites.update()
+            self.all_sprites.reindex()
+            self.camera.update(self.player)
 
         # game over condition
         if len(self.mobs) == 0:
             self.playing = False
 
+        with self.profiler.phase('collide_items'):
+            self.collide_items()
+        with self.profiler.phase('collide_mobs'):
+            self.collide_mobs()
+        with self.profiler.phase('collide_bullets'):
+            self.collide_bullets()
+
+    def collide_items(self):
         # player hits items
         hits = pg.sprite.spritecollide(self.player, self.items, False)
         for hit in hits:
             if hit.type == 'health' and self.player.health < PLAYER_HEALTH:
                 hit.kill()
-                self.effects_sounds['health_up'].play()
+                self.sounds.play(EFFECTS_SOUNDS['health_up'])
                 self.player.add_health(HEALTH_PACK_AMOUNT)
             if hit.type == 'shotgun':
                 hit.kill()
-                self.effects_sounds['gun_pickup'].play()
+                self.sounds.play(EFFECTS_SOUNDS['gun_pickup'])
                 self.player.weapon = 'shotgun'
 
+    def collide_mobs(self):
         # mobs hit player
         hits = pg.sprite.spritecollide(self.player, self.mobs, False, collide_hit_rect)
         for hit in hits:
             if random.random() < 0.7:
-                random.choice(self.player_hit_sounds).play()
+                self.sounds.play(random.choice(PLAYER_HIT_SOUNDS))
             self.player.health -= MOB_DMG
             hit.vel = vector(0, 0)
             if self.player.health <= 0:
@@ -218,6 +309,7 @@ class Game:
             self.player.hit()
             self.player.pos += vector(MOB_KNOCKBACK, 0).rotate(-hits[0].rot)
 
+    def collide_bullets(self):
         # bullets hit mobs
         hits = pg.sprite.groupcollide(self.mobs, self.bullets, False, True)
         for hit in hits:
@@ -233,25 +325,67 @@ class Game:
     def draw(self):
         pg.display.set_caption("{:.2f}".format(self.clock.get_fps()))
         # game loop - draw section
-        self.screen.blit(self.map_img, self.camera.apply_rect(self.map_rect))
-        # self.screen.fill(BG_COLOR)
-        # self.draw_grid()
-        for sprite in self.all_sprites:
-            if isinstance(sprite, Mob):
-                sprite.draw_health()
-            self.screen.blit(sprite.image, self.camera.apply(sprite))
+        with self.profiler.phase('draw_map'):
+            self.map_renderer.draw(self.screen, self.camera)
+            self.decals.draw(self.screen, self.camera)
+            # self.screen.fill(BG_COLOR)
+            # self.draw_grid()
+        with self.profiler.phase('draw_sprites'):
+            # only sprites inside the viewport are drawn
+            view = self.camera.view()
+            visible = self.all_sprites.visible(view)
+            self.drawn_sprites = len(visible)
+            self.culled_sprites = len(self.all_sprites) - self.drawn_sprites
+            for sprite in visible:
+                if isinstance(sprite, Mob):
+                    sprite.draw_health()
+                self.screen.blit(sprite.image, self.camera.apply(sprite))
+                if self.draw_debug:
+                    pg.draw.rect(self.screen, GREEN, self.camera.apply_rect(sprite.hit_rect), 1)
+            if self.particles:
+                self.particles.draw(self.screen, self.camera.camera.topleft)
+        with self.profiler.phase('draw_hud'):
             if self.draw_debug:
-                pg.draw.rect(self.screen, GREEN, self.camera.apply_rect(sprite.hit_rect), 1)
-        if self.draw_debug:
-            for wall in self.walls:
-                pg.draw.rect(self.screen, GREEN, self.camera.apply_rect(wall.rect), 1)
-        # HUD
-        draw_player_health(self.screen, 10, 10, self.player.health / PLAYER_HEALTH)
-        self.draw_text('Zombies: {}'.format(len(self.mobs)), self.hud_font, 30, WHITE, WIDTH - 10, 10, align="ne")
-        if self.paused:
-            self.screen.blit(self.dim_screen, (0, 0))
-            self.draw_text("Paused", self.title_font, 105, RED, WIDTH / 2, HEIGHT / 2, align="center")
-        pg.display.flip()
+                for wall in self.wall_hash.query(view):
+                    pg.draw.rect(self.screen, GREEN, self.camera.apply_rect(wall.rect), 1)
+                self.draw_text('Drawn: {} Culled: {}'.format(self.drawn_sprites, self.culled_sprites),
+                               self.hud_font, 20, WHITE, 10, HEIGHT - 10, align="sw")
+                for i, (name, pool) in enumerate([('Bullets', self.bullet_pool), ('Flashes', self.flash_pool)]):
+                    self.draw_text('{}: {active} active {free} free {created} created {reused} reused'.format(
+                        name, **pool.stats()), self.hud_font, 20, WHITE, 10, HEIGHT - 35 - 25 * i, align="sw")
+                if self.particles:
+                    self.draw_text('Particles: {active} active {capacity} capacity {emitted} emitted'.format(
+                        **self.particles.stats()), self.hud_font, 20, WHITE, 10, HEIGHT - 110, align="sw")
+                self.draw_text('Sounds: {loaded}/{registered} loaded {bytes} of {max_bytes} bytes {evictions} evicted'.format(
+                    **self.sounds.stats()), self.hud_font, 20, WHITE, 10, HEIGHT - 85, align="sw")
+            if self.draw_profiler:
+                self.draw_frame_graph()
+            # HUD
+            draw_player_health(self.screen, 10, 10, self.player.health / PLAYER_HEALTH)
+            self.draw_text('Zombies: {}'.format(len(self.mobs)), self.hud_font, 30, WHITE, WIDTH - 10, 10, align="ne")
+            if self.paused:
+                self.screen.blit(self.dim_screen, (0, 0))
+                self.draw_text("Paused", self.title_font, 105, RED, WIDTH / 2, HEIGHT / 2, align="center")
+        with self.profiler.phase('flip'):
+            pg.display.flip()
+
+    def draw_frame_graph(self):
+        # frame-time graph in the bottom right corner, legend with the phase averages above it
+        rect = pg.Rect(0, 0, PROFILER_GRAPH_WIDTH, PROFILER_GRAPH_HEIGHT)
+        rect.bottomright = (WIDTH - 10, HEIGHT - 10)
+        self.profiler.draw(self.screen, rect)
+        averages = self.profiler.averages()
+        y = rect.top - 5
+        for name in reversed(['total'] + list(PHASE_COLORS)):
+            self.draw_text('{} {:.2f} ms'.format(name, averages.get(name, 0)), self.hud_font, 14,
+                           PHASE_COLORS.get(name, WHITE), rect.left, y, align="sw")
+            y -= 16
+
+    def dump_profile(self):
+        # write the frame timing buffer next to where the game was started from
+        filename = 'frame_profile_{}'.format(time.strftime('%Y%m%d_%H%M%S'))
+        self.profiler.dump(filename + '.csv')
+        self.profiler.dump(filename + '.json')
 
     def events(self):
         # game loop - event management
@@ -263,6 +397,10 @@ class Game:
                     self.quit()
                 if event.key == pg.K_h:
                     self.draw_debug = not self.draw_debug
+                if event.key == pg.K_g:
+                    self.draw_profiler = not self.draw_profiler
+                if event.key == pg.K_t:
+                    self.dump_profile()
                 if event.key == pg.K_p:
                     self.paused = not self.paused
 
@@ -290,9 +428,11 @@ class Game:
                 if event.type == pg.KEYUP:
                     waiting = False
 
-g = Game()
-g.show_start_screen()
-while True:
-    g.new()
-    g.run()
-    g.show_go_screen()
+
+if __name__ == '__main__':
+    g = Game()
+    g.show_start_screen()
+    while True:
+        g.new()
+        g.run()
+        g.show_go_screen()
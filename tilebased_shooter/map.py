@@ -1,6 +1,9 @@
+import os
+from collections import OrderedDict, namedtuple
 import pygame as pg
 import pytmx
 from tilebased_shooter.settings import *
+from tilebased_shooter.mapcache import load_compiled, compile_map
 
 
 def collide_hit_rect(sprite1, sprite2):
@@ -20,24 +23,100 @@ class Map:
         self.height = self.tile_height * TILESIZE
 
 
+# parsed maps by absolute path, reused by every Game.new of the process
+LOADED_MAPS = {}
+
+
+def load_tiled_map(filename):
+    # parse a TMX file only once, or again when it changed on disk
+    key = os.path.abspath(filename)
+    mtime = os.path.getmtime(filename)
+    tiled_map = LOADED_MAPS.get(key)
+    if tiled_map is None or tiled_map.mtime != mtime:
+        tiled_map = TiledMap(filename)
+        tiled_map.mtime = mtime
+        LOADED_MAPS[key] = tiled_map
+    return tiled_map
+
+
+MapObject = namedtuple('MapObject', ['name', 'x', 'y', 'width', 'height'])
+
+
 class TiledMap:
+    # loads from the compiled map cache when it is up to date, otherwise parses
+    # the TMX file with pytmx and (re)writes the cache
     def __init__(self, filename):
-        tm = pytmx.load_pygame(filename, pixelalpha=True)
-        self.width = tm.width * tm.tilewidth
-        self.height = tm.height * tm.tileheight
-        self.tmx_data = tm
+        compiled = load_compiled(filename) if MAP_CACHE else None
+        if compiled:
+            meta = compiled['meta']
+            self.tmx_data = None
+            self.columns = meta['width']
+            self.rows = meta['height']
+            self.tile_width = meta['tile_width']
+            self.tile_height = meta['tile_height']
+            # memory mapped (rows, columns) arrays of tile indices
+            self.layers = list(compiled['layers'])
+            self.objects = [MapObject(str(obj['name']), float(obj['x']), float(obj['y']),
+                                      float(obj['width']), float(obj['height'])) for obj in compiled['objects']]
+            self.tile_pixels = compiled['tiles']
+            self.tile_alpha = meta['tile_alpha']
+            self.tile_colorkeys = meta['tile_colorkeys']
+            self.tile_images = {}
+            self.get_tile = self.compiled_tile
+        else:
+            tm = pytmx.load_pygame(filename, pixelalpha=True)
+            self.tmx_data = tm
+            self.columns = tm.width
+            self.rows = tm.height
+            self.tile_width = tm.tilewidth
+            self.tile_height = tm.tileheight
+            tile_layers = [layer for layer in tm.visible_layers if isinstance(layer, pytmx.TiledTileLayer)]
+            self.layers = [layer.data for layer in tile_layers]
+            self.objects = list(tm.objects)
+            self.get_tile = tm.get_tile_image_by_gid
+            if MAP_CACHE:
+                compile_map(filename, tm, tile_layers)
+        self.width = self.columns * self.tile_width
+        self.height = self.rows * self.tile_height
+        self.mtime = None
+        # rendered chunks without any splats, shared by all sessions on this map
+        self.pristine_chunks = OrderedDict()
+        # flow field blocked grids by tile size, the walls come from this map's objects
+        self.blocked_tiles = {}
+
+    def compiled_tile(self, index):
+        # tile surfaces are built from the mapped pixels on first use, in the format pytmx gave them
+        if not index:
+            return None
+        tile = self.tile_images.get(index)
+        if tile is None:
+            tile = pg.image.frombuffer(self.tile_pixels[index], (self.tile_width, self.tile_height), 'RGBA')
+            tile = tile.convert_alpha() if self.tile_alpha[index] else tile.convert()
+            if self.tile_colorkeys[index]:
+                tile.set_colorkey(self.tile_colorkeys[index])
+            self.tile_images[index] = tile
+        return tile
 
     def render(self, surface):
-        # alias for function
-        ti = self.tmx_data.get_tile_image_by_gid
-
-        for layer in self.tmx_data.visible_layers:
-            if isinstance(layer, pytmx.TiledTileLayer):
-                for x, y, gid in layer:
-                    tile = ti(gid)
+        self.render_area(surface, pg.Rect(0, 0, self.width, self.height))
+
+    def render_area(self, surface, area):
+        # render only the tiles overlapping area, with area.topleft drawn at (0, 0)
+        ti = self.get_tile
+        tile_width = self.tile_width
+        tile_height = self.tile_height
+        x1 = max(0, area.left // tile_width)
+        y1 = max(0, area.top // tile_height)
+        x2 = min(self.columns, -(-area.right // tile_width))
+        y2 = min(self.rows, -(-area.bottom // tile_height))
+
+        for layer in self.layers:
+            for y in range(y1, y2):
+                row = layer[y]
+                for x in range(x1, x2):
+                    tile = ti(int(row[x]))
                     if tile:
-                        surface.blit(tile, (x * self.tmx_data.tilewidth,
-                                            y * self.tmx_data.tileheight))
+                        surface.blit(tile, (x * tile_width - area.x, y * tile_height - area.y))
 
     def make_map(self):
         temp_surface = pg.Surface((self.width, self.height))
@@ -45,6 +124,106 @@ class TiledMap:
         return temp_surface
 
 
+class ChunkedMapRenderer:
+    # renders the map in fixed size chunks when they come into view instead of
+    # baking one map sized surface, at most max_chunks stay resident (LRU);
+    # chunks are taken from the map's pristine cache and only copied once
+    # decals are baked onto them, so a new session starts without rendering
+    def __init__(self, tiled_map, chunk_tiles=MAP_CHUNK_TILES, max_chunks=MAP_CHUNK_CACHE,
+                 prefetch=MAP_CHUNK_PREFETCH, max_pristine=MAP_PRISTINE_CACHE):
+        self.map = tiled_map
+        self.chunk_width = chunk_tiles * tiled_map.tile_width
+        self.chunk_height = chunk_tiles * tiled_map.tile_height
+        self.columns = -(-tiled_map.width // self.chunk_width)
+        self.rows = -(-tiled_map.height // self.chunk_height)
+        self.max_chunks = max_chunks
+        self.max_pristine = max_pristine
+        self.prefetch = prefetch
+        self.chunks = OrderedDict()
+        # DecalLayer baking into the chunks, replayed when a chunk is rendered again
+        self.decals = None
+
+    def chunk_rect(self, key):
+        rect = pg.Rect(key[0] * self.chunk_width, key[1] * self.chunk_height,
+                       self.chunk_width, self.chunk_height)
+        return rect.clip(pg.Rect(0, 0, self.map.width, self.map.height))
+
+    def keys_in(self, rect):
+        x1 = max(0, rect.left // self.chunk_width)
+        y1 = max(0, rect.top // self.chunk_height)
+        x2 = min(self.columns - 1, (rect.right - 1) // self.chunk_width)
+        y2 = min(self.rows - 1, (rect.bottom - 1) // self.chunk_height)
+        return [(x, y) for y in range(y1, y2 + 1) for x in range(x1, x2 + 1)]
+
+    def pristine_chunk(self, key):
+        cache = self.map.pristine_chunks
+        cache_key = (self.chunk_width, self.chunk_height) + key
+        surface = cache.get(cache_key)
+        if surface is None:
+            rect = self.chunk_rect(key)
+            surface = pg.Surface(rect.size)
+            self.map.render_area(surface, rect)
+            cache[cache_key] = surface
+            while len(cache) > self.max_pristine:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(cache_key)
+        return surface
+
+    def render_chunk(self, key):
+        surface = self.pristine_chunk(key)
+        if self.decals:
+            rect = self.chunk_rect(key)
+            decals = self.decals.in_rect(rect)
+            if decals:
+                surface = surface.copy()
+                for decal in decals:
+                    surface.blit(decal.image, decal.rect.move(-rect.x, -rect.y))
+        return surface
+
+    def get_chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.render_chunk(key)
+            self.chunks[key] = chunk
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def bake(self, decal):
+        # paint a new decal into the resident chunks it overlaps
+        for key in self.keys_in(decal.rect):
+            chunk = self.chunks.get(key)
+            if chunk:
+                if chunk is self.map.pristine_chunks.get((self.chunk_width, self.chunk_height) + key):
+                    # never paint on the shared pristine surface
+                    chunk = chunk.copy()
+                    self.chunks[key] = chunk
+                rect = self.chunk_rect(key)
+                chunk.blit(decal.image, decal.rect.move(-rect.x, -rect.y))
+
+    def invalidate(self, rect):
+        # drop the resident chunks overlapping rect, they render again when needed
+        for key in self.keys_in(rect):
+            self.chunks.pop(key, None)
+
+    def draw(self, surface, camera):
+        view = camera.view()
+        for key in self.keys_in(view):
+            surface.blit(self.get_chunk(key), camera.apply_rect(self.chunk_rect(key)))
+
+        # render a few chunks around the viewport ahead of time to avoid hitches
+        budget = self.prefetch
+        for key in self.keys_in(view.inflate(self.chunk_width * 2, self.chunk_height * 2)):
+            if budget <= 0:
+                break
+            if key not in self.chunks:
+                self.get_chunk(key)
+                budget -= 1
+
+
 class Camera:
     def __init__(self, width, height):
         self.camera = pg.Rect(0, 0, width, height)
@@ -57,6 +236,10 @@ class Camera:
     def apply_rect(self, rect):
         return rect.move(self.camera.topleft)
 
+    def view(self):
+        # the part of the map currently on screen, in map coordinates
+        return pg.Rect(-self.camera.x, -self.camera.y, WIDTH, HEIGHT)
+
     def update(self, target):
         x = -target.rect.centerx + int(WIDTH / 2)
         y = -target.rect.centery + int(HEIGHT / 2)
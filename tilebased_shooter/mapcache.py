@@ -0,0 +1,134 @@
+# Compiled binary cache for TMX maps: the visible tile layers as arrays of tile
+# indices, a packed object table and the RGBA pixels of every used tile, stored
+# as .npy files next to the map and memory mapped on load
+import json
+import os
+import pygame as pg
+from tilebased_shooter.settings import *
+from common.sources import SourceFiles
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# bump when the layout of the cache files changes
+MAP_CACHE_VERSION = 3
+
+OBJECT_DTYPE = [('name', 'U32'), ('x', 'f8'), ('y', 'f8'), ('width', 'f8'), ('height', 'f8')]
+
+
+def cache_dir(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), MAP_CACHE_DIR,
+                        os.path.basename(filename))
+
+
+def source_files(filename, tilesets):
+    folder = os.path.dirname(os.path.abspath(filename))
+    return [os.path.normpath(os.path.join(folder, source)) for source in tilesets]
+
+
+def map_sources(filename, meta):
+    # the sources of meta keyed by absolute path, sharing meta's [mtime, sha1] entries
+    # so SourceFiles.is_fresh() updates meta; they are stored relative to the map folder
+    folder = os.path.dirname(os.path.abspath(filename))
+    return {os.path.normpath(os.path.join(folder, source)): entry for source, entry in meta['sources'].items()}
+
+
+def write_meta(folder, meta):
+    with open(os.path.join(folder, 'meta.json'), 'w') as file:
+        json.dump(meta, file, indent=2)
+
+
+def load_compiled(filename):
+    # memory mapped cache contents, or None if numpy is missing or the cache is stale
+    if np is None:
+        return None
+    folder = cache_dir(filename)
+    try:
+        with open(os.path.join(folder, 'meta.json')) as file:
+            meta = json.load(file)
+        # the map and its tilesets, cheap mtime checks first and hashes only for moved mtimes
+        sources = SourceFiles()
+        if meta.get('version') != MAP_CACHE_VERSION or not sources.is_fresh(map_sources(filename, meta)):
+            return None
+        if sources.touched:
+            # touched but unchanged, store the new mtimes so later loads skip the hashing
+            write_meta(folder, meta)
+        return {
+            'meta': meta,
+            'layers': np.load(os.path.join(folder, 'layers.npy'), mmap_mode='r'),
+            'objects': np.load(os.path.join(folder, 'objects.npy')),
+            'tiles': np.load(os.path.join(folder, 'tiles.npy'), mmap_mode='r')
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def compile_map(filename, tmx_data, tile_layers):
+    # write the cache for a map parsed by pytmx, returns False if it can't be represented
+    if np is None:
+        return False
+    tile_width = tmx_data.tilewidth
+    tile_height = tmx_data.tileheight
+
+    # tile index 0 is empty, every used gid gets the next free index. Tiles
+    # without per pixel alpha are stored opaque and rebuilt with convert(),
+    # along with their colorkey, so they blit exactly like the pytmx surfaces
+    indices = {}
+    pixels = [np.zeros((tile_height, tile_width, 4), dtype=np.uint8)]
+    alphas = [True]
+    colorkeys = [None]
+    layers = np.zeros((len(tile_layers), tmx_data.height, tmx_data.width), dtype=np.uint32)
+    for i, layer in enumerate(tile_layers):
+        for y, row in enumerate(layer.data):
+            for x, gid in enumerate(row):
+                if gid not in indices:
+                    tile = tmx_data.get_tile_image_by_gid(gid)
+                    if tile is None:
+                        indices[gid] = 0
+                    elif tile.get_size() != (tile_width, tile_height):
+                        return False
+                    else:
+                        indices[gid] = len(pixels)
+                        data = pg.image.tobytes(tile, 'RGBA')
+                        tile_pixels = np.frombuffer(data, dtype=np.uint8).reshape(tile_height, tile_width, 4)
+                        alpha = bool(tile.get_flags() & pg.SRCALPHA)
+                        if not alpha:
+                            # the 4th byte of a surface without alpha is undefined
+                            tile_pixels = tile_pixels.copy()
+                            tile_pixels[..., 3] = 255
+                        colorkey = tile.get_colorkey()
+                        pixels.append(tile_pixels)
+                        alphas.append(alpha)
+                        colorkeys.append(list(colorkey) if colorkey else None)
+                layers[i, y, x] = indices[gid]
+
+    objects = np.array([(obj.name or '', obj.x, obj.y, obj.width, obj.height) for obj in tmx_data.objects],
+                       dtype=OBJECT_DTYPE)
+    map_folder = os.path.dirname(os.path.abspath(filename))
+    tilesets = source_files(filename, [tileset.source for tileset in tmx_data.tilesets if tileset.source])
+    files = SourceFiles()
+    meta = {
+        'version': MAP_CACHE_VERSION,
+        # relative to the map folder, a moved or cloned repository keeps its caches
+        'sources': {os.path.relpath(source, map_folder): files.fingerprint(source)
+                    for source in [os.path.abspath(filename)] + tilesets if os.path.exists(source)},
+        'width': tmx_data.width,
+        'height': tmx_data.height,
+        'tile_width': tile_width,
+        'tile_height': tile_height,
+        'tile_alpha': alphas,
+        'tile_colorkeys': colorkeys
+    }
+
+    folder = cache_dir(filename)
+    os.makedirs(folder, exist_ok=True)
+    if os.path.exists(os.path.join(folder, 'meta.json')):
+        os.remove(os.path.join(folder, 'meta.json'))
+    np.save(os.path.join(folder, 'layers.npy'), layers)
+    np.save(os.path.join(folder, 'objects.npy'), objects)
+    np.save(os.path.join(folder, 'tiles.npy'), np.stack(pixels))
+    # meta last, a cache without it is never picked up
+    write_meta(folder, meta)
+    return True
@@ -0,0 +1,34 @@
+class SpritePool:
+    # recycles killed sprites instead of constructing new ones, pooled sprite
+    # classes take (game, *args) in __init__, re-arm in reset(*args) and call
+    # release() from kill()
+    def __init__(self, sprite_class, game):
+        self.sprite_class = sprite_class
+        self.game = game
+        self.free = []
+        self.active = 0
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(self.game, *args)
+            self.created += 1
+        self.active += 1
+        return sprite
+
+    def release(self, sprite):
+        self.active -= 1
+        self.free.append(sprite)
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'free': len(self.free),
+            'created': self.created,
+            'reused': self.reused
+        }
@@ -0,0 +1,87 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+import pygame as pg
+from tilebased_shooter.settings import *
+
+# leaf phases of one frame in loop order, with their colour in the frame-time graph
+PHASE_COLORS = {
+    'events': (255, 255, 255),
+    'update_sprites': (0, 200, 255),
+    'collide_items': (0, 120, 255),
+    'collide_mobs': (160, 80, 255),
+    'collide_bullets': (255, 80, 200),
+    'draw_map': (255, 160, 0),
+    'draw_sprites': (255, 230, 0),
+    'draw_hud': (120, 255, 120),
+    'flip': (180, 180, 180)
+}
+
+
+class FrameProfiler:
+    # times named phases of every frame and keeps the last `size` frames in a ring buffer
+    def __init__(self, size=PROFILER_FRAMES):
+        self.frames = deque(maxlen=size)
+        self.current = {}
+        self.frame_start = 0
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        self.current['total'] = time.perf_counter() - self.frame_start
+        self.frames.append(self.current)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.current[name] = self.current.get(name, 0) + time.perf_counter() - start
+
+    def clear(self):
+        self.frames.clear()
+
+    def averages(self, count=FPS):
+        # mean ms per phase over the last count frames
+        frames = list(self.frames)[-count:]
+        if not frames:
+            return {}
+        totals = {}
+        for frame in frames:
+            for name, seconds in frame.items():
+                totals[name] = totals.get(name, 0) + seconds
+        return {name: seconds / len(frames) * 1000 for name, seconds in totals.items()}
+
+    def dump(self, filename):
+        # .csv gets one row per frame, anything else is written as JSON
+        names = list(PHASE_COLORS) + ['total']
+        rows = [{name: frame.get(name, 0) * 1000 for name in names} for frame in self.frames]
+        with open(filename, 'w', newline='') as file:
+            if filename.endswith('.csv'):
+                writer = csv.DictWriter(file, fieldnames=names)
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                json.dump({'unit': 'ms', 'frames': rows}, file, indent=1)
+
+    def draw(self, surface, rect):
+        # one stacked column per frame, newest on the right, with a line at the frame budget
+        scale = rect.height / (FRAME_BUDGET * 2)
+        surface.fill(BLACK, rect)
+        frames = list(self.frames)[-rect.width:]
+        x = rect.right - len(frames)
+        for frame in frames:
+            bottom = rect.bottom
+            for name, color in PHASE_COLORS.items():
+                height = frame.get(name, 0) * 1000 * scale
+                if height >= 1:
+                    top = max(rect.top, bottom - height)
+                    pg.draw.line(surface, color, (x, bottom - 1), (x, top))
+                    bottom = top
+            x += 1
+        budget_y = rect.bottom - FRAME_BUDGET * scale
+        pg.draw.line(surface, RED, (rect.left, budget_y), (rect.right - 1, budget_y))
+        pg.draw.rect(surface, WHITE, rect, 1)
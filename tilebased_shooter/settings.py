@@ -23,6 +23,7 @@ GRIDWIDTH = WIDTH / TILESIZE
 GRIDHEIGHT = HEIGHT / TILESIZE
 
 WALL_IMAGE = 'tileGreen_39.png'
+WALL_HASH_CELL = TILESIZE * 2
 
 # Mob settings
 MOB_HEALTH = 100
@@ -32,7 +33,12 @@ MOB_HIT_RECT = pg.Rect(0, 0, 30, 30)
 MOB_DMG = 10
 MOB_KNOCKBACK = 20
 MOB_AVOID_RAD = 50
+MOB_HASH_CELL = MOB_AVOID_RAD
+# simulate all mobs in one vectorized NumPy step (falls back to sprites without NumPy)
+BATCHED_MOBS = False
 MOB_DETECT_RAD = 400
+# how far (in tiles) the shared flow field searches out from the player
+FLOW_FIELD_RANGE = 24
 
 # Weapons Settings
 BULLET_IMG = 'bullet.png'
@@ -70,9 +76,44 @@ BARREL_OFFSET = vector(25, 10)
 MUZZLE_FLASHES = ['whitePuff15.png', 'whitePuff16.png', 'whitePuff17.png',
                   'whitePuff18.png']
 FLASH_DURATION = 40
+FLASH_SIZES = range(20, 51)
+# draw muzzle flashes with the vectorized particle system (falls back to pooled sprites without NumPy)
+PARTICLES = True
 SPLAT_IMG = 'splat green.png'
 DMG_ALPHA = [i for i in range(0, 255, 25)]
 
+# Compiled map cache, written next to the TMX file
+MAP_CACHE = True
+MAP_CACHE_DIR = '.mapcache'
+
+# Map chunks (chunk size in tiles, resident chunk cap, chunks prefetched per frame,
+# cap of splat free chunks kept across sessions)
+MAP_CHUNK_TILES = 8
+MAP_CHUNK_CACHE = 32
+MAP_CHUNK_PREFETCH = 1
+MAP_PRISTINE_CACHE = 64
+
+# Decals (splats), oldest evicted past MAX_DECALS, baked into map chunks if DECAL_BAKE
+MAX_DECALS = 256
+DECAL_HASH_CELL = 256
+DECAL_BAKE = False
+
+# Viewport culling
+DRAW_HASH_CELL = 256
+
+# Frame profiler (G toggles the graph, T dumps the buffer)
+PROFILER_FRAMES = 600
+PROFILER_GRAPH_WIDTH = 240
+PROFILER_GRAPH_HEIGHT = 100
+FRAME_BUDGET = 1000 / FPS
+
+# Text cache
+TEXT_CACHE_SIZE = 256
+
+# Rotation cache
+ROTATION_STEP = 2
+ROTATION_CACHE_SIZE = 1024
+
 # Layers
 WALL_LAYER = 1
 PLAYER_LAYER = 2
@@ -90,7 +131,16 @@ HEALTH_PACK_AMOUNT = 20
 BOB_RANGE = 15
 BOB_SPEED = 0.4
 
+# Asset loading
+ASSET_WORKERS = 4
+# scaled and converted images are kept as raw pixels in this folder next to the game
+ASSET_CACHE = True
+ASSET_CACHE_DIR = '.assetcache'
+PRINT_LOAD_REPORT = False
+
 # Sounds
+# decoded sound effects kept in memory, least recently played ones are dropped beyond this
+SOUND_BANK_BYTES = 4 * 1024 * 1024
 BG_MUSIC = 'espionage.ogg'
 PLAYER_HIT_SOUNDS = ['pain/8.wav', 'pain/9.wav', 'pain/10.wav', 'pain/11.wav']
 ZOMBIE_MOAN_SOUNDS = ['brains2.wav', 'brains3.wav', 'zombie-roar-1.wav', 'zombie-roar-2.wav',
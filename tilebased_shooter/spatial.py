@@ -0,0 +1,132 @@
+import pygame as pg
+
+
+class SpatialHash:
+    # uniform grid that buckets items by the cells their rect overlaps
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.ranges = {}
+        # insertion order of the items, collide() returns its hits in this order
+        self.order = {}
+        self.counter = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        # empty rects still occupy the cell of their topleft corner
+        return (int(rect.left // size), int(rect.top // size),
+                int(max(rect.left, rect.right - 1) // size), int(max(rect.top, rect.bottom - 1) // size))
+
+    def add(self, item, rect=None):
+        if rect is None:
+            rect = item.rect
+        cells = self.cell_range(rect)
+        self.ranges[item] = cells
+        if item not in self.order:
+            self.counter += 1
+            self.order[item] = self.counter
+        x1, y1, x2, y2 = cells
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                self.cells.setdefault((x, y), []).append(item)
+
+    def remove(self, item):
+        self.order.pop(item, None)
+        cells = self.ranges.pop(item, None)
+        if cells is None:
+            return
+        x1, y1, x2, y2 = cells
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                bucket = self.cells[(x, y)]
+                bucket.remove(item)
+                if not bucket:
+                    del self.cells[(x, y)]
+
+    def move(self, item, rect):
+        # only touch the buckets if the item crossed into other cells, it keeps its place in the order
+        if self.ranges.get(item) != self.cell_range(rect):
+            order = self.order.get(item)
+            self.remove(item)
+            if order is not None:
+                self.order[item] = order
+            self.add(item, rect)
+
+    def add_point(self, item, x, y):
+        size = self.cell_size
+        self.cells.setdefault((int(x // size), int(y // size)), []).append(item)
+
+    def clear(self):
+        self.cells.clear()
+        self.ranges.clear()
+        self.order.clear()
+
+    def query(self, rect):
+        # all items sharing a cell with rect, without duplicates
+        x1, y1, x2, y2 = self.cell_range(rect)
+        if x1 == x2 and y1 == y2:
+            return list(self.cells.get((x1, y1), ()))
+        found = {}
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                for item in self.cells.get((x, y), ()):
+                    found[item] = None
+        return list(found)
+
+    def query_point(self, x, y, radius):
+        # candidates for a radius search; callers still check the real distance
+        size = self.cell_size
+        cells = self.cells
+        found = []
+        for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                found.extend(cells.get((cx, cy), ()))
+        return found
+
+    def collide(self, rect):
+        # in the order the items were added, the same order spritecollide gives for
+        # the group they came from, so collisions[0] is the same item
+        hits = [item for item in self.query(rect) if rect.colliderect(item.rect)]
+        if len(hits) > 1:
+            hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def collideany(self, rect):
+        for item in self.query(rect):
+            if rect.colliderect(item.rect):
+                return item
+        return None
+
+
+class CulledLayeredUpdates(pg.sprite.LayeredUpdates):
+    # LayeredUpdates that also keeps its sprites in a SpatialHash,
+    # so the draw pass only has to look at sprites inside the viewport
+    def __init__(self, cell_size, *sprites, **kwargs):
+        self.grid = SpatialHash(cell_size)
+        self.order = {}
+        self.counter = 0
+        pg.sprite.LayeredUpdates.__init__(self, *sprites, **kwargs)
+
+    def add_internal(self, sprite, layer=None):
+        pg.sprite.LayeredUpdates.add_internal(self, sprite, layer)
+        # sprites join their groups before they have a rect, reindex() buckets them
+        self.counter += 1
+        self.order[sprite] = self.counter
+
+    def remove_internal(self, sprite):
+        pg.sprite.LayeredUpdates.remove_internal(self, sprite)
+        del self.order[sprite]
+        self.grid.remove(sprite)
+
+    def reindex(self):
+        grid = self.grid
+        for sprite in self.sprites():
+            grid.move(sprite, sprite.rect)
+
+    def visible(self, rect):
+        # sprites intersecting rect, in the same layer order draw() would use
+        layers = self._spritelayers
+        order = self.order
+        sprites = self.grid.collide(rect)
+        sprites.sort(key=lambda sprite: (layers[sprite], order[sprite]))
+        return sprites
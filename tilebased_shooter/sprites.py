@@ -9,9 +9,10 @@ import pytweening as ptw
 vector = pg.math.Vector2
 
 
-def collide_with_walls(sprite, group, direction):
+def collide_with_walls(sprite, walls, direction):
+    # walls is the static SpatialHash of obstacles built in Game.new
     if direction == 'x':
-        collisions = pg.sprite.spritecollide(sprite, group, False, collide_hit_rect)
+        collisions = walls.collide(sprite.hit_rect)
         if collisions:
             if collisions[0].rect.centerx > sprite.hit_rect.centerx:
                 sprite.pos.x = collisions[0].rect.left - sprite.hit_rect.width / 2
@@ -20,7 +21,7 @@ def collide_with_walls(sprite, group, direction):
                 sprite.vel.x = 0
             sprite.hit_rect.centerx = sprite.pos.x
     if direction == 'y':
-        collisions = pg.sprite.spritecollide(sprite, group, False, collide_hit_rect)
+        collisions = walls.collide(sprite.hit_rect)
         if collisions:
             if collisions[0].rect.centery > sprite.hit_rect.centery:
                 sprite.pos.y = collisions[0].rect.top - sprite.hit_rect.height / 2
@@ -44,25 +45,42 @@ class Player(pg.sprite.Sprite):
         self.vel = vector(0, 0)
         self.pos = vector(x, y)
         self.rot = 0
-        self.last_shot = 0
+        # the first shot is never held back
+        self.last_shot = float('-inf')
         self.health = PLAYER_HEALTH
         self.weapon = 'pistol'
         self.damaged = False
         self.healing = False
 
+    def read_keys(self):
+        keys = pg.key.get_pressed()
+        controls = set()
+        if keys[pg.K_LEFT] or keys[pg.K_a]:
+            controls.add('left')
+        if keys[pg.K_RIGHT] or keys[pg.K_d]:
+            controls.add('right')
+        if keys[pg.K_UP] or keys[pg.K_w]:
+            controls.add('forward')
+        if keys[pg.K_DOWN] or keys[pg.K_s]:
+            controls.add('back')
+        if keys[pg.K_SPACE]:
+            controls.add('fire')
+        return controls
+
     def get_keys(self):
         self.rot_speed = 0
         self.vel = vector(0, 0)
-        keys = pg.key.get_pressed()
-        if keys[pg.K_LEFT] or keys[pg.K_a]:
+        # a scripted game.autopilot(game) replaces the keyboard
+        controls = self.game.autopilot(self.game) if self.game.autopilot else self.read_keys()
+        if 'left' in controls:
             self.rot_speed = PLAYER_ROT_SPEED
-        if keys[pg.K_RIGHT] or keys[pg.K_d]:
+        if 'right' in controls:
             self.rot_speed = -PLAYER_ROT_SPEED
-        if keys[pg.K_UP] or keys[pg.K_w]:
+        if 'forward' in controls:
             self.vel = vector(PLAYER_SPEED, 0).rotate(-self.rot)
-        if keys[pg.K_DOWN] or keys[pg.K_s]:
+        if 'back' in controls:
             self.vel = vector(-PLAYER_SPEED / 2, 0).rotate(-self.rot)
-        if keys[pg.K_SPACE]:
+        if 'fire' in controls:
             self.shoot()
 
     def add_health(self, amount):
@@ -77,7 +95,7 @@ class Player(pg.sprite.Sprite):
         self.damage_alpha = chain(DMG_ALPHA * 2)
 
     def shoot(self):
-        now = pg.time.get_ticks()
+        now = self.game.time
         if now - self.last_shot > WEAPONS[self.weapon]['bullet_rate']:
             # spawn a bullet
             self.last_shot = now
@@ -87,17 +105,24 @@ class Player(pg.sprite.Sprite):
             self.vel = vector(-WEAPONS[self.weapon]['kickback'], 0).rotate(-self.rot)
             for i in range(WEAPONS[self.weapon]['bullet_count']):
                 spread = random.uniform(-WEAPONS[self.weapon]['spread'], WEAPONS[self.weapon]['spread'])
-                Bullet(self.game, pos, dir.rotate(spread))
-                snd = random.choice(self.game.weapon_sounds[self.weapon])
+                self.game.bullet_pool.acquire(pos, dir.rotate(spread))
+                snd = self.game.sounds.get(random.choice(WEAPON_SOUNDS[self.weapon]))
                 if snd.get_num_channels() > 2:
                     snd.stop()
                 snd.play()
-            MuzzleFlash(self.game, pos)
+            if self.game.particles:
+                flash = random.randrange(len(self.game.scaled_gun_flashes))
+                self.game.particles.emit(('flash', flash), pos)
+            else:
+                self.game.flash_pool.acquire(pos)
 
     def update(self):
         self.get_keys()
         self.rot = (self.rot + self.rot_speed * self.game.dt) % 360
-        self.image = pg.transform.rotate(self.game.player_img, self.rot)
+        self.image = self.game.rotation_cache.get(self.game.player_img, self.rot)
+        if self.damaged or self.healing:
+            # tint a copy, the rotated image is shared through the cache
+            self.image = self.image.copy()
         if self.damaged:
             try:
                 self.image.fill((255, 0, 0, next(self.damage_alpha)), special_flags=pg.BLEND_RGBA_MULT)
@@ -113,9 +138,9 @@ class Player(pg.sprite.Sprite):
         self.rect.center = self.pos
         self.pos += self.vel * self.game.dt
         self.hit_rect.centerx = self.pos.x
-        collide_with_walls(self, self.game.walls, 'x')
+        collide_with_walls(self, self.game.wall_hash, 'x')
         self.hit_rect.centery = self.pos.y
-        collide_with_walls(self, self.game.walls, 'y')
+        collide_with_walls(self, self.game.wall_hash, 'y')
         self.rect.center = self.hit_rect.center
 
 
@@ -147,25 +172,36 @@ class Obstacle(pg.sprite.Sprite):
 
 
 class Bullet(pg.sprite.Sprite):
+    # pooled, spawn through game.bullet_pool.acquire(pos, dir)
     def __init__(self, game, pos, dir):
         self._layer = BULLET_LAYER
         self.groups = game.all_sprites, game.bullets
-        pg.sprite.Sprite.__init__(self, self.groups)
+        pg.sprite.Sprite.__init__(self)
         self.game = game
-        self.image = game.bullet_images[WEAPONS[game.player.weapon]['bullet_size']]
+        self.reset(pos, dir)
+
+    def reset(self, pos, dir):
+        self.image = self.game.bullet_images[WEAPONS[self.game.player.weapon]['bullet_size']]
         self.rect = self.image.get_rect()
         self.hit_rect = self.rect
         self.pos = vector(pos)
         self.rect.center = pos
-        self.vel = dir * WEAPONS[game.player.weapon]['bullet_speed'] * random.uniform(0.9, 1.1)
-        self.spawn_time = pg.time.get_ticks()
+        self.vel = dir * WEAPONS[self.game.player.weapon]['bullet_speed'] * random.uniform(0.9, 1.1)
+        self.spawn_time = self.game.time
+        self.add(self.groups)
+
+    def kill(self):
+        # a bullet can be killed twice in one frame (wall and lifetime)
+        if self.alive():
+            pg.sprite.Sprite.kill(self)
+            self.game.bullet_pool.release(self)
 
     def update(self):
         self.pos += self.vel * self.game.dt
         self.rect.center = self.pos
-        if pg.sprite.spritecollideany(self, self.game.walls):
+        if self.game.wall_hash.collideany(self.rect):
             self.kill()
-        if pg.time.get_ticks() - self.spawn_time > WEAPONS[self.game.player.weapon]['bullet_lifetime']:
+        if self.game.time - self.spawn_time > WEAPONS[self.game.player.weapon]['bullet_lifetime']:
             self.kill()
 
 
@@ -194,9 +230,12 @@ class Mob(pg.sprite.Sprite):
         # not calc sqrt because of relatively slow computation time
         if target_distance.length_squared() < MOB_DETECT_RAD**2:
             if random.random() < 0.002:
-                random.choice(self.game.zombie_moan_sounds).play()
-            self.rot = target_distance.angle_to(vector(1, 0))
-            self.image = pg.transform.rotate(self.game.mob_img, self.rot)
+                self.game.sounds.play(random.choice(ZOMBIE_MOAN_SOUNDS))
+            # follow the shared flow field around walls, head straight for the target on its tile
+            flow = self.game.flow_field.direction(self.pos)
+            heading = flow if flow else target_distance
+            self.rot = heading.angle_to(vector(1, 0))
+            self.image = self.game.rotation_cache.get(self.game.mob_img, self.rot)
             self.rect = self.image.get_rect()
             self.rect.center = self.pos
             self.acc = vector(1, 0).rotate(-self.rot)
@@ -206,22 +245,24 @@ class Mob(pg.sprite.Sprite):
             self.vel += self.acc * self.game.dt
             self.pos += self.vel * self.game.dt + 0.5 * self.acc * self.game.dt ** 2
             self.hit_rect.centerx = self.pos.x
-            collide_with_walls(self, self.game.walls, 'x')
+            collide_with_walls(self, self.game.wall_hash, 'x')
             self.hit_rect.centery = self.pos.y
-            collide_with_walls(self, self.game.walls, 'y')
+            collide_with_walls(self, self.game.wall_hash, 'y')
             self.rect.center = self.hit_rect.center
         # kill if no more health
         if self.health <= 0:
-            random.choice(self.game.zombie_hit_sounds).play()
+            self.game.sounds.play(random.choice(ZOMBIE_HIT_SOUNDS))
             self.kill()
-            self.game.map_img.blit(self.game.splat_img, self.pos - vector(32, 32))
+            self.game.decals.add(self.game.splat_img, self.pos - vector(32, 32))
 
     def avoid_mobs(self):
-        for mob in self.game.mobs:
+        # only look at mobs in the neighbouring cells of the per-frame mob grid
+        for mob in self.game.mob_hash.query_point(self.pos.x, self.pos.y, MOB_AVOID_RAD):
             if mob != self:
                 dist = self.pos - mob.pos
-                if 0 < dist.length() < MOB_AVOID_RAD:
-                    self.acc += dist.normalize()
+                length = dist.length()
+                if 0 < length < MOB_AVOID_RAD:
+                    self.acc += dist / length
 
     def draw_health(self):
         if self.health > 60:
@@ -234,25 +275,37 @@ class Mob(pg.sprite.Sprite):
         width = int(self.rect.width * self.health / MOB_HEALTH)
         self.health_bar = pg.Rect(0, 0, width, 7)
         if self.health < MOB_HEALTH:
+            # draw on a copy, the rotated image is shared through the cache
+            self.image = self.image.copy()
             pg.draw.rect(self.image, color, self.health_bar)
 
 
 class MuzzleFlash(pg.sprite.Sprite):
+    # pooled, spawn through game.flash_pool.acquire(pos)
     def __init__(self, game, pos):
         self._layer = EFFECTS_LAYER
         self.groups = game.all_sprites
-        pg.sprite.Sprite.__init__(self, self.groups)
+        pg.sprite.Sprite.__init__(self)
         self.game = game
-        size = random.randint(20, 50)
-        self.image = pg.transform.scale(random.choice(self.game.gun_flashes), (size, size))
+        self.reset(pos)
+
+    def reset(self, pos):
+        # flash images are pre-scaled to every size in load_data
+        self.image = random.choice(self.game.scaled_gun_flashes)
         self.rect = self.image.get_rect()
         self.pos = pos
         self.rect.center = pos
         self.hit_rect = self.rect
-        self.spawn_timer = pg.time.get_ticks()
+        self.spawn_timer = self.game.time
+        self.add(self.groups)
+
+    def kill(self):
+        if self.alive():
+            pg.sprite.Sprite.kill(self)
+            self.game.flash_pool.release(self)
 
     def update(self):
-        if pg.time.get_ticks() - self.spawn_timer > FLASH_DURATION:
+        if self.game.time - self.spawn_timer > FLASH_DURATION:
             self.kill()
 
 